@@ -0,0 +1,51 @@
+"""Compare the commit extraction engines on a synthetic repository
+
+    python -m benchmarks.bench_extract --commits 100000
+"""
+
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+from git import Repo
+
+from benchmarks.synthetic import make_repo
+from gitsint.modules.repos.repository import _extract_commits
+
+
+def main():
+    parser = ArgumentParser(description="Commit extraction benchmark")
+    parser.add_argument("--commits", type=int, default=100000)
+    parser.add_argument("--authors", type=int, default=500)
+    parser.add_argument("--branches", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        path = make_repo(
+            Path(tmp) / "synthetic.git", args.commits, args.authors, args.branches
+        )
+        print(f"created {args.commits} commits in {time.perf_counter() - start:.2f}s")
+
+        repo_obj = Repo(path)
+        results = {}
+        for engine in ("git", "gitpython"):
+            start = time.perf_counter()
+            authors, messages = _extract_commits(repo_obj, engine=engine)
+            elapsed = time.perf_counter() - start
+            results[engine] = (authors, messages)
+            print(
+                f"{engine:>10}: {elapsed:8.2f}s  "
+                f"{len(messages) / elapsed:10.0f} commits/s  "
+                f"{len(authors)} authors"
+            )
+
+        git_authors, git_messages = results["git"]
+        py_authors, py_messages = results["gitpython"]
+        same = sorted(map(str, git_authors)) == sorted(map(str, py_authors))
+        print(f"same authors: {same}, same messages: {git_messages == py_messages}")
+
+
+if __name__ == "__main__":
+    main()
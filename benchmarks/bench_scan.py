@@ -0,0 +1,153 @@
+"""End-to-end scan benchmark against the local GitHub stand-in
+
+    python -m benchmarks.bench_scan --users 4 --repos 20 --commits 2000 --followers 500
+
+The repository and friends modules are run on their own, then maincore
+scans every fake user. Nothing leaves the machine: API and followers
+pages come from benchmarks.fake_github, clones from local bare remotes.
+Every run starts from an empty output folder.
+"""
+
+import contextlib
+import functools
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+import httpx
+import trio
+
+import gitsint
+from benchmarks.fake_github import FakeGitHub
+from gitsint.modules import load_module
+
+
+def module_args(output):
+    """The arguments maincore would give the modules, with its defaults"""
+    return {
+        "output": output,
+        "fork": False,
+        "size": 0,
+        "token": None,
+        "private": False,
+        "clone_workers": 4,
+        "page_workers": 8,
+        "commit_engine": "git",
+        "message_mode": "all",
+    }
+
+
+def run_module(fake, name, output):
+    """Run one module on the first fake user, return (seconds, records)"""
+    module = load_module(name)
+
+    async def main():
+        out = []
+        async with httpx.AsyncClient(transport=fake.transport()) as client:
+            user = (await client.get(f"https://api.github.com/users/{fake.logins[0]}")).json()
+            start = time.perf_counter()
+            await module(user, client, out, module_args(output))
+            return time.perf_counter() - start, out
+
+    return trio.run(main)
+
+
+def run_maincore(fake, workdir, concurrency):
+    """Scan every fake user with the CLI, return (seconds, timing report)"""
+    report = Path(workdir) / "profile.json"
+    sys.argv = [
+        "gitsint",
+        *fake.logins,
+        "--cli",
+        "--no-clear",
+        "--concurrency",
+        str(concurrency),
+        "--output",
+        str(Path(workdir) / "results"),
+        "--ndjson",
+        str(Path(workdir) / "results.ndjson"),
+        "--profile-report",
+        str(report),
+    ]
+    build_client = gitsint.build_client
+    gitsint.build_client = functools.partial(build_client, transport=fake.transport())
+    try:
+        start = time.perf_counter()
+        trio.run(gitsint.maincore)
+        elapsed = time.perf_counter() - start
+    finally:
+        gitsint.build_client = build_client
+    with open(report, encoding="utf8") as report_file:
+        return elapsed, json.load(report_file)
+
+
+def summary(label, timings, unit, count):
+    mean = statistics.mean(timings)
+    best = min(timings)
+    print(f"{label:>12}: mean {mean:8.3f}s  best {best:8.3f}s  {count / best:10.1f} {unit}/s")
+
+
+def main():
+    parser = ArgumentParser(description="Offline scan benchmark")
+    parser.add_argument("--users", type=int, default=2)
+    parser.add_argument("--repos", type=int, default=10)
+    parser.add_argument("--commits", type=int, default=500)
+    parser.add_argument("--authors", type=int, default=20)
+    parser.add_argument("--followers", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds slept per request")
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        fake = FakeGitHub(
+            tmp,
+            users=args.users,
+            repos=args.repos,
+            commits=args.commits,
+            authors=args.authors,
+            followers=args.followers,
+            latency=args.latency,
+        )
+        print(
+            f"created {args.repos} remotes of {args.commits} commits "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+
+        repository, friends, scans = [], [], []
+        reports = []
+        for run in range(args.runs):
+            workdir = Path(tmp) / f"run{run}"
+            # The modules and the CLI print progress, keep the summary readable
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(
+                io.StringIO()
+            ):
+                elapsed, _ = run_module(fake, "repository", str(workdir / "repository"))
+                repository.append(elapsed)
+                elapsed, _ = run_module(fake, "friends", str(workdir / "friends"))
+                friends.append(elapsed)
+                elapsed, report = run_maincore(fake, workdir, args.concurrency)
+                scans.append(elapsed)
+                reports.append(report)
+
+    summary("repository", repository, "repos", args.repos)
+    summary("friends", friends, "followers", args.followers)
+    summary("maincore", scans, "users", args.users)
+
+    print("per-module latency in maincore (mean of the runs):")
+    names = sorted({name for report in reports for name in report.get("modules", {})})
+    for name in names:
+        means = [report["modules"][name]["mean"] for report in reports if name in report["modules"]]
+        print(f"{name:>12}: {statistics.mean(means):8.3f}s")
+    requests = statistics.mean(report["http"]["requests"] for report in reports)
+    print(f"{'requests':>12}: {requests:.0f} per scan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Import-time benchmark of module discovery
+
+    python -m benchmarks.bench_startup --runs 10
+
+Every scenario runs in a fresh interpreter so nothing is cached.
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+
+SCENARIOS = {
+    "baseline (python only)": "pass",
+    "import gitsint": "import gitsint",
+    "registry: profile only": (
+        "import gitsint\n"
+        "from gitsint.modules import load_module\n"
+        "load_module('profile')"
+    ),
+    "registry: all modules": (
+        "import gitsint\n"
+        "from gitsint.modules import load_module, select_modules\n"
+        "[load_module(name) for name in select_modules()]"
+    ),
+    "legacy: import_submodules": (
+        "import gitsint\n"
+        "gitsint.get_functions(gitsint.import_submodules('gitsint.modules'))"
+    ),
+}
+
+
+def measure(code, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), min(timings)
+
+
+def main():
+    parser = ArgumentParser(description="Startup / module discovery benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<28} {'median ms':>10} {'min ms':>10}")
+    for name, code in SCENARIOS.items():
+        median, best = measure(code, args.runs)
+        print(f"{name:<28} {median:>10.1f} {best:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Local stand-in for the GitHub API, the followers pages and git remotes
+
+Serves everything gitsint reads through an httpx.MockTransport, so the
+benchmarks run the real modules without network access:
+
+    GET api.github.com/users/{login}
+    GET api.github.com/users/{login}/repos?per_page=100&page=N   (Link header)
+    GET api.github.com/repos/{owner}/{repo}/commits?page=N       (--commits-api)
+    GET github.com/{login}?tab=followers|following&page=N        (HTML)
+
+Repositories are synthetic bare repositories cloned through file:// urls.
+"""
+
+from pathlib import Path
+
+import httpx
+import trio
+
+from benchmarks.synthetic import make_repo
+
+REPOS_PER_PAGE = 100
+USERS_PER_PAGE = 50
+COMMITS_PER_PAGE = 100
+
+
+class FakeGitHub:
+    def __init__(
+        self,
+        root,
+        users=1,
+        repos=10,
+        commits=200,
+        authors=20,
+        followers=120,
+        latency=0.0,
+    ):
+        """Create `users` users owning `repos` repositories of `commits` commits
+
+        Every user has `followers` followers and follows every other one
+        of them. `latency` seconds are slept before answering a request.
+        """
+        self.root = Path(root)
+        self.logins = [f"user{index}" for index in range(users)]
+        self.repo_count = repos
+        self.followers = followers
+        self.latency = latency
+        self.requests = 0
+
+        # Every user shares the same remotes, only their listing differs
+        self.remotes = []
+        for index in range(repos):
+            path = self.root / "remotes" / f"repo{index}.git"
+            if not path.exists():
+                make_repo(path, commits, authors, branches=2, seed=f"repo{index} ")
+            self.remotes.append(path)
+        self.commits = commits
+        self.authors = authors
+
+    def transport(self):
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request):
+        self.requests += 1
+        if self.latency:
+            await trio.sleep(self.latency)
+        url = request.url
+        parts = [part for part in url.path.split("/") if part]
+        if url.host == "github.com" and len(parts) == 1:
+            return self.friends_page(parts[0], url.params)
+        if url.host == "api.github.com" and parts[:1] == ["users"]:
+            if len(parts) == 2:
+                return self.user(parts[1])
+            if len(parts) == 3 and parts[2] == "repos":
+                return self.repos_page(parts[1], url)
+        if url.host == "api.github.com" and parts[:1] == ["repos"] and parts[3:] == ["commits"]:
+            return self.commits_page(parts[2], url)
+        return httpx.Response(404, json={"message": "Not Found"})
+
+    def user(self, login):
+        if login not in self.logins:
+            return httpx.Response(404, json={"message": "Not Found"})
+        return httpx.Response(
+            200,
+            json={
+                "login": login,
+                "id": self.logins.index(login) + 1,
+                "name": login.capitalize(),
+                "company": None,
+                "location": None,
+                "email": None,
+                "public_repos": self.repo_count,
+                "followers": self.followers,
+                "following": self.followers,
+            },
+        )
+
+    def repos_page(self, login, url):
+        page = int(url.params.get("page", 1))
+        start = (page - 1) * REPOS_PER_PAGE
+        data = [
+            {
+                "name": path.stem,
+                "full_name": f"{login}/{path.stem}",
+                "clone_url": path.resolve().as_uri(),
+                "description": f"Synthetic repository {path.stem}",
+                "fork": False,
+                "archived": False,
+                "language": "Python",
+                "stargazers_count": index,
+                "size": 100,
+                "pushed_at": "2024-01-01T00:00:00Z",
+            }
+            for index, path in enumerate(self.remotes[start : start + REPOS_PER_PAGE])
+        ]
+        last = max(1, -(-self.repo_count // REPOS_PER_PAGE))
+        base = f"https://api.github.com/users/{login}/repos?per_page={REPOS_PER_PAGE}"
+        headers = {"Link": f'<{base}&page={last}>; rel="last"'}
+        return httpx.Response(200, json=data, headers=headers)
+
+    def commits_page(self, repo, url):
+        page = int(url.params.get("page", 1))
+        start = (page - 1) * COMMITS_PER_PAGE
+        stop = min(self.commits, start + COMMITS_PER_PAGE)
+        data = [
+            {
+                "sha": f"{repo}-{index}",
+                "commit": {
+                    "author": {
+                        "name": f"Dev {index % self.authors}",
+                        "email": f"dev{index % self.authors}@example.com",
+                    },
+                    "message": f"commit {index}",
+                },
+            }
+            for index in range(start, stop)
+        ]
+        last = max(1, -(-self.commits // COMMITS_PER_PAGE))
+        base = str(url.copy_remove_param("page"))
+        headers = {"Link": f'<{base}&page={last}>; rel="last"'}
+        return httpx.Response(200, json=data, headers=headers)
+
+    def friends_page(self, login, params):
+        page = int(params.get("page", 1))
+        start = (page - 1) * USERS_PER_PAGE
+        stop = min(self.followers, start + USERS_PER_PAGE)
+        spans = "".join(
+            f'<div><span class="Link--primary">Friend {index}</span>'
+            f'<span class="Link--secondary">friend{index}</span></div>'
+            for index in range(start, stop)
+        )
+        return httpx.Response(200, text=f"<html><body>{spans}</body></html>")
@@ -0,0 +1,49 @@
+"""Synthetic git repositories for the benchmarks"""
+
+import subprocess
+from pathlib import Path
+
+
+def make_repo(path, commits, authors=50, branches=1, seed=""):
+    """Create a bare repository with `commits` empty-tree commits
+
+    History is written with a single `git fast-import` so even 100k
+    commits only take a few seconds. Commits are spread over `branches`
+    branches forked from the first commit and rotate over `authors`
+    identities. `seed` changes every SHA, for unrelated repositories.
+    """
+    path = Path(path)
+    subprocess.run(["git", "init", "-q", "--bare", str(path)], check=True)
+
+    lines = []
+    per_branch = max(1, commits // branches)
+    mark = 0
+    for branch in range(branches):
+        for index in range(per_branch):
+            mark += 1
+            author = mark % authors
+            message = f"{seed}commit {mark} on branch {branch}\n\nBody of commit {mark}\n"
+            data = message.encode()
+            lines.append(f"commit refs/heads/branch{branch}\n".encode())
+            lines.append(f"mark :{mark}\n".encode())
+            lines.append(
+                f"author Dev {author} <dev{author}@example.com> {1600000000 + mark} +0000\n".encode()
+            )
+            lines.append(
+                f"committer Dev {author} <dev{author}@example.com> {1600000000 + mark} +0000\n".encode()
+            )
+            lines.append(f"data {len(data)}\n".encode() + data)
+            if index == 0 and mark > 1:
+                lines.append(b"from :1\n")
+            lines.append(b"\n")
+
+    subprocess.run(
+        ["git", "-C", str(path), "fast-import", "--quiet"],
+        input=b"".join(lines),
+        check=True,
+    )
+    subprocess.run(
+        ["git", "-C", str(path), "symbolic-ref", "HEAD", "refs/heads/branch0"],
+        check=True,
+    )
+    return path
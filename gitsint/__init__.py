@@ -1,24 +1,23 @@
 import csv
 import importlib
 import json
+import math
 import os
 import pkgutil
 import subprocess
+import sys
 import time
 from argparse import ArgumentParser
 from datetime import datetime
 from importlib.metadata import PackageNotFoundError, version
 
 import httpx
-import requests
 import trio
 from termcolor import colored
 
-from gitsint.instruments import TrioProgress
 
 DEBUG = True
 OUTPUT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../output"))
-json_data = []
 username_FORMAT = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
 
 try:
@@ -101,29 +100,37 @@ def credit(args):
     print_fancy_credits()
 
 
-def fetch_user(username: str, args) -> str:
+async def fetch_user(username: str, client, args) -> str:
     """Check if the input is a valid username address
 
     Keyword Arguments:
     username       -- String to be tested
+    client         -- Shared httpx.AsyncClient
 
     Return Value:
-    User     -- True if string is an username, False otherwise
+    User     -- The GitHub user object, or an error message
     """
-    headers = {}
-    if args.token:
-        headers["Authorization"] = f"Bearer {args.token[0]}"
+    from gitsint.utils.tokens import auth_headers
+
+    headers = auth_headers(vars(args))
     url = f"https://api.github.com/users/{username}"
-    r = requests.get(url.format(username), headers=headers)
-    res = r.json()
-    if "message" in res:
-        if res["message"] == "Not Found":  # Just to be double sure
-            res = "Error: User not found"
-        elif res["message"].startswith("API rate limit exceeded"):
-            res = "Error: API rate limit exceeded, please try again later or give a --token argument"
-        elif res["message"].startswith("Bad credentials"):
-            res = "Error: Bad credentials, please check your --token argument"
-    return res
+    r = await client.get(url, headers=headers)
+    try:
+        res = r.json()
+    except ValueError:
+        res = None
+    if r.status_code == 200 and isinstance(res, dict) and "login" in res:
+        return res
+    message = res.get("message") if isinstance(res, dict) else None
+    message = message if isinstance(message, str) else ""
+    if message == "Not Found":  # Just to be double sure
+        return "Error: User not found"
+    if message.startswith("API rate limit exceeded"):
+        return "Error: API rate limit exceeded, please try again later or give a --token argument"
+    if message.startswith("Bad credentials"):
+        return "Error: Bad credentials, please check your --token argument"
+    detail = f"{r.status_code} {message}".strip()
+    return f"Error: unexpected response from GitHub ({detail})"
 
 
 def print_result(data, args, user, start_time, functions):
@@ -180,19 +187,8 @@ def print_result(data, args, user, start_time, functions):
         elif rdata is not None and exists == True and others is None:
             print("")
             websiteprint = print_color("[~] " + domain, "cyan", args)
-            print(websiteprint)
-            # print(f"{key.capitalize()}: " + print_color(value, "cyan", args))
-            if isinstance(rdata, str):
-                rdata = json.loads(rdata)
-
-            toprint = ""
-            # print("Data: " + str(rdata))
-            # print(type(rdata))
-
-            print_json(rdata, args)
-        elif rdata is not None and exists == True and others is None:
-            print("")
-            websiteprint = print_color("[~] " + domain, "cyan", args)
+            if results.get("partial"):
+                websiteprint += " (partial)"
             print(websiteprint)
 
             if isinstance(rdata, str):
@@ -230,7 +226,7 @@ def print_result(data, args, user, start_time, functions):
 
 
 def print_api(data, output_file=None):
-
+    json_data = []
     for module_data in data:
 
         json_data.append({"module_name": module_data["name"], "data": module_data})
@@ -294,7 +290,9 @@ def export_csv(data, args, username):
         file_path = os.path.join(output_dir, name_file)
 
         with open(file_path, "w", encoding="utf8", newline="") as output_file:
-            fc = csv.DictWriter(output_file, fieldnames=data[0].keys())
+            # Partial records carry a "partial" key the others do not have
+            fieldnames = list(dict.fromkeys(key for record in data for key in record))
+            fc = csv.DictWriter(output_file, fieldnames=fieldnames)
             fc.writeheader()
             fc.writerows(data)
 
@@ -309,25 +307,63 @@ def export_csv(data, args, username):
         with open(file_path, "w", encoding="utf8") as output_file:
             json.dump(data, output_file, indent=4)
 
-        exit("All results have been exported to " + file_path)
+        print("All results have been exported to " + file_path)
+
 
+async def launch_module(module, profile, client, out, args, deadline=math.inf):
+    """Run one module and hand its records over as soon as they are produced
+
+    Every record is streamed to the --ndjson sink, if any, and appended to
+    `out` unless it is None. The module is cancelled at the target
+    `deadline` or when its --module-budget runs out, keeping the records
+    it produced, and a partial record is added if it did not add one.
+    """
+    from gitsint.utils.budget import module_deadline, partial_record
+    from gitsint.utils.ndjson import RecordStream
 
-async def launch_module(module, profile, client, out, args):
     data = {
         "profile": "aprofile",
         "friends": "friends",
         "repository": "repository",
         "track": "track",
     }
+    if not isinstance(profile, dict) or "login" not in profile:
+        print(f"{module.__name__}: not a GitHub user: {profile!r}")
+        return
+    journal = getattr(args, "journal_log", None)
+    if journal is not None:
+        # Finished in a previous run of the scan
+        records = journal.module_records(profile["login"], module.__name__)
+        if records is not None:
+            if out is not None:
+                out.extend(records)
+            return
+        journal.module_started(profile["login"], module.__name__)
+    module_out = RecordStream(
+        profile["login"], getattr(args, "ndjson_sink", None), out, journal, module.__name__
+    )
+    profiler = getattr(args, "profiler", None)
+    start = time.perf_counter()
+    budgets = getattr(args, "module_budgets", None)
     try:
-        await module(profile, client, out, args)
+        with trio.move_on_at(
+            module_deadline(budgets, module.__name__, trio.current_time(), deadline)
+        ) as scope:
+            await module(profile, client, module_out, args)
+        if scope.cancelled_caught:
+            print(f"{module.__name__}: time budget expired for {profile['login']}")
+            if not module_out.partial:
+                name = module.__name__
+                module_out.append(partial_record(name, data.get(name, name)))
+        elif journal is not None and not (module_out.partial or module_out.failed):
+            journal.module_done(profile["login"], module.__name__)
     except Exception as e:
         print(e)
-        name = str(module).split("<function ")[1].split(" ")[0]
-        out.append(
+        name = module.__name__
+        module_out.append(
             {
                 "name": name,
-                "domain": data[name],
+                "domain": data.get(name, name),
                 "rateLimit": False,
                 "error": True,
                 "exists": False,
@@ -335,24 +371,384 @@ async def launch_module(module, profile, client, out, args):
                 "others": None,
             }
         )
+    finally:
+        if profiler is not None:
+            profiler.record("modules", module.__name__, time.perf_counter() - start)
+
+
+def build_client(args, transport=None):
+    """Create the httpx client shared by every module and username
+
+    `transport` replaces the network transport at the bottom of the stack,
+    e.g. a httpx.MockTransport for offline runs.
+    """
+    if transport is None:
+        try:
+            import h2  # noqa: F401
+
+            http2 = True
+        except ImportError:
+            http2 = False
+        # One pooled, keep-alive transport for every request of the run
+        transport = httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=30,
+            ),
+        )
+    profiler = getattr(args, "profiler", None)
+    if profiler is not None:
+        from gitsint.instruments import ProfilingTransport
+
+        # Innermost: only what really goes over the network is measured
+        transport = ProfilingTransport(transport, profiler)
+    from gitsint.utils.adaptive import AdaptiveTransport
+
+    # Below the token pool: secondary limits are retried with the same
+    # token, exhausted tokens still go back to the pool
+    transport = AdaptiveTransport(
+        transport,
+        maximum=max(1, args.http_concurrency),
+        retries=args.http_retries,
+        profiler=profiler,
+    )
+    auth = None
+    if args.token:
+        from gitsint.utils.tokens import TokenPool, TokenPoolTransport
+
+        # The pool authenticates the API requests, see tokens.auth_headers
+        args.token_pool = TokenPool(args.token, profiler)
+        transport = auth = TokenPoolTransport(transport, args.token_pool)
+    if args.cache_dir:
+        from gitsint.utils.cache import CacheTransport
+
+        # Above the pool: keyed on the tokens the pool will use
+        transport = CacheTransport(
+            transport,
+            os.path.expanduser(args.cache_dir),
+            ttl=args.cache_ttl,
+            max_size=args.cache_size * 1024 * 1024,
+            auth=auth,
+        )
+    return httpx.AsyncClient(timeout=args.timeout, transport=transport)
+
+
+def read_usernames(args):
+    """Collect the target usernames from the CLI and from --file
+
+    Blank lines and lines starting with '#' are ignored, duplicates are
+    only scanned once.
+    """
+    usernames = list(args.username)
+    if args.file:
+        if args.file == "-":
+            lines = sys.stdin.read().splitlines()
+        else:
+            with open(args.file, "r", encoding="utf8") as input_file:
+                lines = input_file.read().splitlines()
+        usernames.extend(lines)
+
+    unique = {}
+    for username in usernames:
+        username = username.strip()
+        if username and not username.startswith("#"):
+            unique.setdefault(username, None)
+    return list(unique)
+
+
+async def scan_user(username, functions, client, args, limiter):
+    """Run every module against one username and report its results
+
+    A failure only ends the scan of this username, the batch goes on.
+    """
+    try:
+        await _scan_user(username, functions, client, args, limiter)
+    except Exception as e:
+        print(colored(f"{username}: scan failed: {e!r}", "red"))
+
+
+async def _scan_user(username, functions, client, args, limiter):
+    journal = args.journal_log
+    if journal is not None and journal.is_user_done(username):
+        print(f"{username}: already scanned, skipped")
+        return
+
+    async with limiter:
+        start_time = time.time()
+        # The --deadline of a target runs from the start of its own scan
+        deadline = trio.current_time() + args.deadline if args.deadline else math.inf
+        user = "Error: deadline expired before the user was fetched"
+        with trio.move_on_at(deadline):
+            user = await fetch_user(username, client, args)
+        if "Error" in user:
+            print(colored(f"{username}: {user}", "red"))
+            return
+
+        # With --ndjson only, records are streamed and never kept in memory
+        keep = not args.ndjson or args.csvoutput or args.jsonoutput or args.db
+        # Launching the modules
+        out = [] if keep else None
+        try:
+            async with trio.open_nursery() as nursery:
+                for website in functions:
+                    nursery.start_soon(
+                        launch_module, website, user, client, out, args, deadline
+                    )
+        finally:
+            if args.graphql:
+                from gitsint.utils import graphql
+
+                graphql.forget(user["login"])
+
+    # Usernames with a partial or failed module are scanned again on resume
+    done = journal is not None and all(
+        journal.module_records(user["login"], module.__name__) is not None
+        for module in functions
+    )
+
+    if out is None:
+        if done:
+            journal.user_done(username, user["login"])
+        return
+
+    if args.store is not None:
+        # One writer at a time, off the event loop
+        await trio.to_thread.run_sync(
+            args.store.save_scan, username, out, user, limiter=args.store_limiter
+        )
+
+    # Sort by modules names
+    out = sorted(out, key=lambda i: i["name"])
+    # Print the result as soon as this username is done
+    if not args.ndjson:
+        if args.cli:
+            print_api(out)
+        else:
+            print_result(out, args, user, start_time, functions)
+
+    # Export results
+    print()
+    if out:
+        export_csv(out, args, username)
+    if done:
+        journal.user_done(username, user["login"])
 
 
 async def maincore():
+    from gitsint.utils.filters import cli_date
+
     parser = ArgumentParser(description=f"gitsint v{__version__}")
     parser.add_argument(
-        "username", nargs="+", metavar="USERNAME", help="Target Username"
+        "username", nargs="*", metavar="USERNAME", help="Target Username"
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        type=str,
+        required=False,
+        dest="file",
+        help="Read target usernames from a file, one per line ('-' for stdin)",
+    )
+    parser.add_argument(
+        "--clone-workers",
+        type=int,
+        default=4,
+        required=False,
+        dest="clone_workers",
+        help="Number of repositories cloned at the same time (default 4)",
+    )
+    parser.add_argument(
+        "--clone-mode",
+        choices=["full", "partial", "bare", "mirror"],
+        default="full",
+        required=False,
+        dest="clone_mode",
+        help="How repositories are cloned: full, partial (--filter=blob:none), "
+        "bare or mirror (default full, use full with --gitleaks)",
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=0,
+        required=False,
+        dest="depth",
+        help="Only clone the last DEPTH commits of every branch (default: all)",
+    )
+    parser.add_argument(
+        "--object-cache",
+        metavar="DIR",
+        required=False,
+        dest="object_cache",
+        help="Share git objects between clones: one bare store per fork network in DIR, clones borrow from it with --reference (keep DIR, clones depend on it)",
+    )
+    parser.add_argument(
+        "--commit-index",
+        metavar="FILE",
+        required=False,
+        dest="commit_index",
+        help="SQLite index of the commits already read, shared history of forks is only parsed once, in this scan and the next ones",
+    )
+    parser.add_argument(
+        "--commit-engine",
+        choices=["git", "gitpython"],
+        default="git",
+        required=False,
+        dest="commit_engine",
+        help="Read commits from a `git log` stream (default) or with GitPython",
+    )
+    parser.add_argument(
+        "--http-concurrency",
+        type=int,
+        default=32,
+        required=False,
+        dest="http_concurrency",
+        help="Max requests in flight per host, the limit adapts to latency and rate limits (default 32)",
+    )
+    parser.add_argument(
+        "--http-retries",
+        type=int,
+        default=3,
+        required=False,
+        dest="http_retries",
+        help="Retries of a GET on 429, secondary rate limits, 5xx and network errors (default 3)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        required=False,
+        dest="deadline",
+        help="Time budget of each username, modules still running are cancelled and report partial results (default 0, no limit)",
+    )
+    parser.add_argument(
+        "--module-budget",
+        nargs="+",
+        metavar="[MODULE=]SECONDS",
+        required=False,
+        dest="module_budget",
+        help="Time budget of every module (SECONDS) or of one module (MODULE=SECONDS), e.g. --module-budget 60 repository=300",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        required=False,
+        dest="cache_dir",
+        help="Cache GitHub API responses in this directory and revalidate them with ETags",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=0,
+        required=False,
+        dest="cache_ttl",
+        help="Serve cached responses younger than this many seconds without revalidating (default 0)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=100,
+        required=False,
+        dest="cache_size",
+        help="Max size of the HTTP cache in MB (default 100)",
+    )
+    parser.add_argument(
+        "--graphql",
+        default=False,
+        required=False,
+        action="store_true",
+        dest="graphql",
+        help="With a --token, collect repositories and followers through the GraphQL API",
+    )
+    parser.add_argument(
+        "--page-workers",
+        type=int,
+        default=8,
+        required=False,
+        dest="page_workers",
+        help="Number of API pages fetched at the same time (default 8)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=5,
+        required=False,
+        dest="concurrency",
+        help="Number of usernames scanned at the same time (default 5)",
     )
     # add size
+    parser.add_argument(
+        "--modules",
+        nargs="+",
+        metavar="MODULE",
+        required=False,
+        dest="modules",
+        help="Only run these modules (profile, friends, repository)",
+    )
+    parser.add_argument(
+        "--skip-modules",
+        nargs="+",
+        metavar="MODULE",
+        required=False,
+        dest="skip_modules",
+        help="Do not run these modules",
+    )
     parser.add_argument(
         "--size",
         type=int,
         default=0,
         required=False,
         dest="size",
-        help="Set max size value (default 50000)",
+        help="Set max size in KB of cloned repositories, bigger ones are read through the API (default 500000)",
     )
     parser.add_argument(
-        "--token", nargs="+", metavar="TOKEN", dest="token", help="API token"
+        "--commits-api",
+        default=False,
+        required=False,
+        action="store_true",
+        dest="commits_api",
+        help="Read commit authors through the API instead of cloning any repository",
+    )
+    parser.add_argument(
+        "--max-commits",
+        type=int,
+        default=1000,
+        required=False,
+        dest="max_commits",
+        help="Max commits read per repository through the API (default 1000)",
+    )
+    parser.add_argument(
+        "--messages",
+        choices=["all", "sample", "spill", "none"],
+        default="all",
+        required=False,
+        dest="message_mode",
+        help="Keep all commit messages, a sample of them, spill them to a NDJSON file per repository, or none (default all)",
+    )
+    parser.add_argument(
+        "--max-messages",
+        type=int,
+        default=1000,
+        required=False,
+        dest="max_messages",
+        help="Messages kept per repository with --messages sample (default 1000)",
+    )
+    parser.add_argument(
+        "--message-length",
+        type=int,
+        default=0,
+        required=False,
+        dest="message_length",
+        help="Truncate commit messages to this many characters (default 0, no truncation)",
+    )
+    parser.add_argument(
+        "--token",
+        nargs="+",
+        metavar="TOKEN",
+        dest="token",
+        help="API token(s), requests go to the token with the most rate limit left",
     )
     parser.add_argument(
         "--fork",
@@ -362,6 +758,76 @@ async def maincore():
         dest="fork",
         help="Include forked repositories",
     )
+    parser.add_argument(
+        "--pushed-after",
+        type=cli_date,
+        metavar="DATE",
+        required=False,
+        dest="pushed_after",
+        help="Only clone repositories pushed after this ISO date (e.g. 2024-01-31)",
+    )
+    parser.add_argument(
+        "--pushed-before",
+        type=cli_date,
+        metavar="DATE",
+        required=False,
+        dest="pushed_before",
+        help="Only clone repositories pushed before this ISO date",
+    )
+    parser.add_argument(
+        "--language",
+        nargs="+",
+        metavar="LANGUAGE",
+        required=False,
+        dest="language",
+        help="Only clone repositories written in these languages",
+    )
+    parser.add_argument(
+        "--archived",
+        choices=["include", "exclude", "only"],
+        default="include",
+        required=False,
+        dest="archived",
+        help="Include, exclude or only keep archived repositories (default include)",
+    )
+    parser.add_argument(
+        "--min-stars",
+        type=int,
+        required=False,
+        dest="min_stars",
+        help="Only clone repositories with at least this many stars",
+    )
+    parser.add_argument(
+        "--max-stars",
+        type=int,
+        required=False,
+        dest="max_stars",
+        help="Only clone repositories with at most this many stars",
+    )
+    parser.add_argument(
+        "--include",
+        nargs="+",
+        metavar="GLOB",
+        required=False,
+        dest="include",
+        help="Only clone repositories whose name matches one of these globs",
+    )
+    parser.add_argument(
+        "--exclude",
+        nargs="+",
+        metavar="GLOB",
+        required=False,
+        dest="exclude",
+        help="Skip repositories whose name matches one of these globs",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=0,
+        required=False,
+        dest="top",
+        help="Only clone the N most recently pushed repositories",
+    )
     parser.add_argument(
         "--private",
         default=False,
@@ -412,6 +878,30 @@ async def maincore():
         dest="jsonoutput",
         help="Create a JSON with the results",
     )
+    parser.add_argument(
+        "--ndjson",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        required=False,
+        dest="ndjson",
+        help="Stream every module result as one JSON line to FILE (default stdout) as soon as it is done",
+    )
+    parser.add_argument(
+        "--db",
+        type=str,
+        required=False,
+        dest="db",
+        help="Store users, repositories, commit authors and emails in this SQLite database",
+    )
+    parser.add_argument(
+        "--db-email",
+        type=str,
+        metavar="EMAIL",
+        required=False,
+        dest="db_email",
+        help="List the users of --db sharing this commit email, then exit",
+    )
     parser.add_argument(
         "-T",
         "--timeout",
@@ -455,6 +945,27 @@ async def maincore():
         dest="debug",
         help="Enable debug mode",
     )
+    parser.add_argument(
+        "--profile-report",
+        metavar="FILE",
+        required=False,
+        dest="profile_report",
+        help="Write a JSON timing report of the scan: modules, HTTP requests, clone / extract / gitleaks phases, rate limit waits, scheduler",
+    )
+    parser.add_argument(
+        "--journal",
+        metavar="FILE",
+        required=False,
+        dest="journal",
+        help="Log every finished module, repository and page to FILE as the scan goes, an interrupted scan continues with --resume FILE",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="FILE",
+        required=False,
+        dest="resume",
+        help="Continue the scan logged in the --journal FILE: finished usernames, modules, repositories and pages are skipped",
+    )
     parser.add_argument(
         "--check-update",
         action="store_true",
@@ -468,58 +979,151 @@ async def maincore():
         dest="gitleaks",
         help="Run gitleaks against all cloned repos",
     )
+    parser.add_argument(
+        "--gitleaks-workers",
+        type=int,
+        default=2,
+        required=False,
+        dest="gitleaks_workers",
+        help="Number of gitleaks scans running at the same time (default 2)",
+    )
 
     args = parser.parse_args()
 
+    journal = None
+    if args.resume:
+        from gitsint.utils.journal import Journal
+
+        if not os.path.exists(args.resume):
+            parser.error(f"no journal at {args.resume}")
+        journal = Journal(args.resume)
+        if journal.argv is None:
+            parser.error(f"{args.resume} is not a gitsint journal")
+        path = args.resume
+        if not args.username and not args.file:
+            # Same options and usernames as the interrupted scan
+            args = parser.parse_args(journal.argv)
+            args.username = journal.usernames
+            args.file = None
+        args.journal = args.resume = path
+
+    # Before anything is printed: stdout may carry the NDJSON lines
+    args.ndjson_sink = None
+    if args.ndjson:
+        from gitsint.utils.ndjson import NDJSONSink
+
+        args.ndjson_sink = NDJSONSink(args.ndjson)
+        if args.ndjson == "-":
+            # Keep stdout for the NDJSON lines, everything else goes to stderr
+            sys.stdout = sys.stderr
+
     if args.gitleaks:
         from gitsint.utils import gitleaks
 
         gitleaks.setup_gitleaks()
+        if args.clone_mode != "full":
+            print(
+                f"Warning: gitleaks needs file contents, --clone-mode {args.clone_mode} "
+                "will make it fetch or miss blobs"
+            )
 
     credit(args)
     if args.check_update:
         check_update()
-    username = args.username[0]
-
-    user = fetch_user(username, args)
-    if "Error" in user:
-        print(colored(user, "red"))
-        exit()
-
-    # Import Modules
-    modules = import_submodules("gitsint.modules")
-    functions = get_functions(modules, args)
-    # Get timeout
-    timeout = args.timeout
-    # Start time
-    start_time = time.time()
-    # Def the async client
-    client = httpx.AsyncClient(timeout=timeout)
-    # Launching the modules
-    out = []
-
-    instrument = TrioProgress(len(functions))
+
+    args.store = None
+    if args.db:
+        from gitsint.utils.store import Store
+
+        args.store = Store(args.db)
+        args.store_limiter = trio.CapacityLimiter(1)
+        if args.db_email:
+            rows = args.store.users_by_email(args.db_email)
+            for login, repo, author in rows:
+                print(f"{login}\t{repo}\t{author}")
+            print(f"{len(set(row[0] for row in rows))} scanned users share {args.db_email}")
+            args.store.close()
+            if args.ndjson_sink is not None:
+                args.ndjson_sink.close()
+            return
+
+    usernames = read_usernames(args)
+    if not usernames:
+        parser.error("at least one USERNAME or --file is required")
+    if len(usernames) > 1:
+        # Keep the reports of the users already scanned on screen
+        args.noclear = True
+
+    args.journal_log = None
+    if args.journal:
+        from gitsint.utils.journal import Journal
+
+        args.journal_log = journal or Journal(args.journal)
+        if args.journal_log.argv is None:
+            args.journal_log.scan(sys.argv[1:], usernames)
+        elif args.journal_log.users_done:
+            print(f"Resuming {args.journal}: {len(args.journal_log.users_done)} usernames already scanned")
+
+    # Import only the selected modules
+    from gitsint.modules import load_module, select_modules
+
+    try:
+        names = select_modules(args.modules, args.skip_modules)
+    except ValueError as e:
+        parser.error(str(e))
+    functions = [load_module(name) for name in names]
+
+    from gitsint.utils.budget import parse_budgets
+
+    try:
+        args.module_budgets = parse_budgets(args.module_budget)
+    except ValueError as e:
+        parser.error(str(e))
+    args.profiler = None
+    if args.profile_report:
+        from gitsint.instruments import Profiler
+
+        args.profiler = Profiler()
+        trio.lowlevel.add_instrument(args.profiler)
+
+    # Def the async client, shared by every scanned username
+    client = build_client(args)
+    limiter = trio.CapacityLimiter(max(1, args.concurrency))
+    args.seen_commits = None
+    if args.commit_index:
+        from gitsint.utils.commit_index import CommitIndex
+
+        args.seen_commits = CommitIndex(args.commit_index)
+
+    # Clone and gitleaks workers are shared by every scanned username
+    args.clone_limiter = trio.CapacityLimiter(max(1, args.clone_workers))
+    args.gitleaks_limiter = trio.CapacityLimiter(max(1, args.gitleaks_workers))
+
+    from gitsint.instruments import TrioProgress
+
+    instrument = TrioProgress(len(functions) * len(usernames))
     trio.lowlevel.add_instrument(instrument)
     async with trio.open_nursery() as nursery:
-        for website in functions:
-            nursery.start_soon(launch_module, website, user, client, out, args)
+        for username in usernames:
+            nursery.start_soon(scan_user, username, functions, client, args, limiter)
     trio.lowlevel.remove_instrument(instrument)
 
-    # Sort by modules names
-    out = sorted(out, key=lambda i: i["name"])
     # Close the client
     await client.aclose()
-    # Print the result
-    if args.cli:
-        print_api(out)
-    else:
-        print_result(out, args, user, start_time, functions)
+    if args.ndjson_sink is not None:
+        args.ndjson_sink.close()
+    if args.store is not None:
+        args.store.close()
+    if args.seen_commits is not None:
+        args.seen_commits.close()
+    if args.journal_log is not None:
+        args.journal_log.close()
+    if args.profiler is not None:
+        trio.lowlevel.remove_instrument(args.profiler)
+        args.profiler.write(args.profile_report)
+        print("Timing report written to " + args.profile_report)
     credit(args)
 
-    # Export results
-    print()
-    export_csv(out, args, username)
-
 
 def main():
     trio.run(maincore)
@@ -1,11 +1,188 @@
+import contextlib
+import json
+import threading
+import time
+
+import httpx
 import trio
-from tqdm import tqdm
 
 
 class TrioProgress(trio.abc.Instrument):
     def __init__(self, total):
+        from tqdm import tqdm
+
         self.tqdm = tqdm(total=total)
 
     def task_exited(self, task):
         if task.name.split(".")[-1] == "launch_module":
             self.tqdm.update(1)
+
+
+class Timing:
+    """Count, total, min and max of the durations recorded under one name"""
+
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        self.min = elapsed if self.min is None else min(self.min, elapsed)
+        self.max = max(self.max, elapsed)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0,
+            "min": round(self.min or 0, 6),
+            "max": round(self.max, 6),
+        }
+
+
+class Profiler(trio.abc.Instrument):
+    """Timing report of a scan, written with --profile-report
+
+    The trio hooks measure the scheduler (task steps, the longest step
+    blocking the loop, time waiting for I/O). Module runs, HTTP requests,
+    clone / extract / gitleaks phases and rate limit waits are recorded
+    by the code doing them, from the event loop or from worker threads.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.timings = {}
+        self.http = {"requests": 0, "bytes_sent": 0, "bytes_received": 0, "status": {}}
+        self.scheduler = {
+            "tasks_spawned": 0,
+            "task_steps": 0,
+            "step_time": 0.0,
+            "longest_step": 0.0,
+            "longest_step_task": None,
+            "io_waits": 0,
+            "io_wait_time": 0.0,
+        }
+        self._step_started = None
+        self._io_started = None
+
+    def record(self, category, name, elapsed):
+        with self.lock:
+            timing = self.timings.setdefault(category, {}).get(name)
+            if timing is None:
+                timing = self.timings[category][name] = Timing()
+            timing.add(elapsed)
+
+    @contextlib.contextmanager
+    def timed(self, category, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, name, time.perf_counter() - start)
+
+    def record_request(self, request, response, elapsed):
+        """Latency (until the response headers) of one HTTP request"""
+        route = "/" + request.url.path.lstrip("/").split("/", 1)[0]
+        self.record("requests", f"{request.method} {request.url.host}{route}", elapsed)
+        with self.lock:
+            self.http["requests"] += 1
+            self.http["bytes_sent"] += int(request.headers.get("content-length") or 0)
+            status = str(response.status_code)
+            self.http["status"][status] = self.http["status"].get(status, 0) + 1
+
+    def record_bytes(self, size):
+        with self.lock:
+            self.http["bytes_received"] += size
+
+    # trio.abc.Instrument hooks, always called from the event loop thread
+
+    def task_spawned(self, task):
+        self.scheduler["tasks_spawned"] += 1
+
+    def before_task_step(self, task):
+        self._step_started = time.perf_counter()
+
+    def after_task_step(self, task):
+        if self._step_started is None:
+            return
+        elapsed = time.perf_counter() - self._step_started
+        self._step_started = None
+        self.scheduler["task_steps"] += 1
+        self.scheduler["step_time"] += elapsed
+        if elapsed > self.scheduler["longest_step"]:
+            self.scheduler["longest_step"] = elapsed
+            self.scheduler["longest_step_task"] = task.name
+
+    def before_io_wait(self, timeout):
+        self._io_started = time.perf_counter()
+
+    def after_io_wait(self, timeout):
+        if self._io_started is None:
+            return
+        self.scheduler["io_waits"] += 1
+        self.scheduler["io_wait_time"] += time.perf_counter() - self._io_started
+        self._io_started = None
+
+    def report(self):
+        with self.lock:
+            scheduler = dict(self.scheduler)
+            for key in ("step_time", "longest_step", "io_wait_time"):
+                scheduler[key] = round(scheduler[key], 6)
+            return {
+                "wall_time": round(time.perf_counter() - self.started, 6),
+                "scheduler": scheduler,
+                "http": dict(self.http),
+                **{
+                    category: {name: timing.as_dict() for name, timing in timings.items()}
+                    for category, timings in sorted(self.timings.items())
+                },
+            }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf8") as report_file:
+            json.dump(self.report(), report_file, indent=4)
+
+
+def timed(profiler, category, name):
+    """Profiler.timed when --profile-report is set, a no-op otherwise"""
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.timed(category, name)
+
+
+class ProfilingTransport(httpx.AsyncBaseTransport):
+    """Report the latency and size of every request to a Profiler"""
+
+    def __init__(self, transport, profiler):
+        self.transport = transport
+        self.profiler = profiler
+
+    async def handle_async_request(self, request):
+        start = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        self.profiler.record_request(request, response, time.perf_counter() - start)
+        response.stream = CountingStream(response.stream, self.profiler)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class CountingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, profiler):
+        self.stream = stream
+        self.profiler = profiler
+
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            self.profiler.record_bytes(len(chunk))
+            yield chunk
+
+    async def aclose(self):
+        await self.stream.aclose()
@@ -0,0 +1,51 @@
+"""Registry of the gitsint modules
+
+Modules are declared here as "package.module:function" and only imported
+when they are selected. Third-party packages can add their own through
+the "gitsint.modules" entry point group.
+"""
+
+import importlib
+from importlib.metadata import entry_points
+
+ENTRY_POINT_GROUP = "gitsint.modules"
+
+MODULES = {
+    "friends": "gitsint.modules.profile.friends:friends",
+    "profile": "gitsint.modules.profile.profile:profile",
+    "repository": "gitsint.modules.repos.repository:repository",
+}
+
+
+def available_modules():
+    """Map every module name to its "package.module:function" target"""
+    modules = dict(MODULES)
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        modules.setdefault(entry_point.name, entry_point.value)
+    return modules
+
+
+def select_modules(selected=None, skipped=None):
+    """Names of the modules to run, in registry order
+
+    Raises ValueError for unknown module names.
+    """
+    modules = available_modules()
+    unknown = [name for name in (selected or []) + (skipped or []) if name not in modules]
+    if unknown:
+        raise ValueError(
+            f"Unknown module(s): {', '.join(unknown)} "
+            f"(available: {', '.join(sorted(modules))})"
+        )
+    return [
+        name
+        for name in modules
+        if (not selected or name in selected) and name not in (skipped or [])
+    ]
+
+
+def load_module(name):
+    """Import a registered module and return its coroutine function"""
+    target = available_modules()[name]
+    module_path, _, function = target.partition(":")
+    return getattr(importlib.import_module(module_path), function)
@@ -1,11 +1,24 @@
 import json
+from argparse import Namespace
 
+import trio
 from bs4 import BeautifulSoup
 
 from gitsint import *
+from gitsint.utils import budget, graphql
+from gitsint.utils.pagination import DEFAULT_PAGE_WORKERS, page_count
 
+# Users listed on one page of the followers / following tabs
+USERS_PER_PAGE = 50
 
-async def extract_usernames(url, client, out):
+
+async def extract_usernames(url, client, out, journal=None, login=None):
+    """Users listed on one page, taken from the --journal when it was
+    already fetched by a previous run of the scan"""
+    if journal is not None:
+        friends = journal.page(login, url)
+        if friends is not None:
+            return friends
     friends = []
     response = await client.get(url)
     soup = BeautifulSoup(response.text, "html.parser")
@@ -22,35 +35,98 @@ async def extract_usernames(url, client, out):
             link = f"https://github.com/{username}"
             friends.append({"name": name, "username": username, "link": link})
 
+    if journal is not None and response.status_code == 200:
+        journal.page_done(login, url, friends)
     return friends
 
 
-async def extract_all_usernames(url, client, out):
+async def extract_all_usernames(
+    url,
+    client,
+    out,
+    count=None,
+    workers=DEFAULT_PAGE_WORKERS,
+    journal=None,
+    login=None,
+    collected=None,
+):
+    """Scrape every page of a followers / following tab
+
+    When the number of users is known the pages are fetched concurrently,
+    otherwise pages are walked until an empty one. The users of every
+    page are also added to `collected` as soon as it is scraped, so they
+    are still at hand if the scan is cancelled.
+    """
+    collected = collected if collected is not None else []
+    pages = page_count(count, USERS_PER_PAGE)
+    if pages is not None:
+        if count == 0:
+            return []
+        per_page = [None] * pages
+        limiter = trio.CapacityLimiter(max(1, workers))
+
+        async def fetch(page_num):
+            async with limiter:
+                page_url = f"{url}&page={page_num}"
+                per_page[page_num - 1] = await extract_usernames(
+                    page_url, client, out, journal, login
+                )
+                collected.extend(per_page[page_num - 1])
+
+        async with trio.open_nursery() as nursery:
+            for page_num in range(1, pages + 1):
+                nursery.start_soon(fetch, page_num)
+        return [user for page in per_page for user in page]
+
     usernames = []
     page_num = 1
     while True:
         page_url = f"{url}&page={page_num}"
 
-        extracted_usernames = await extract_usernames(page_url, client, out)
+        extracted_usernames = await extract_usernames(page_url, client, out, journal, login)
         if len(extracted_usernames) == 0:
             break
         usernames.extend(extracted_usernames)
+        collected.extend(extracted_usernames)
         page_num += 1
     return usernames
 
 
-async def track(user, client, out):
+async def track(
+    user,
+    client,
+    out,
+    followers=None,
+    following=None,
+    workers=DEFAULT_PAGE_WORKERS,
+    journal=None,
+    collected=None,
+):
     followers_url = f"https://github.com/{user}?tab=followers"
     following_url = f"https://github.com/{user}?tab=following"
 
-    followers_usernames = await extract_all_usernames(followers_url, client, out)
-    following_usernames = await extract_all_usernames(following_url, client, out)
+    results = {}
+    collected = collected if collected is not None else {}
 
-    common_usernames = [
-        user for user in followers_usernames if user in following_usernames
-    ]
+    async def collect(key, url, count):
+        results[key] = await extract_all_usernames(
+            url, client, out, count, workers, journal, user, collected.setdefault(key, [])
+        )
 
-    return json.dumps(common_usernames)
+    # Both lists are scraped at the same time
+    async with trio.open_nursery() as nursery:
+        nursery.start_soon(collect, "followers", followers_url, followers)
+        nursery.start_soon(collect, "following", following_url, following)
+
+    return json.dumps(mutual(results["followers"], results["following"]))
+
+
+def mutual(followers, following):
+    """Followers that the user follows back"""
+    following_usernames = {friend["username"] for friend in following}
+    return [
+        friend for friend in followers if friend["username"] in following_usernames
+    ]
 
 
 async def friends(user, client, out, args):
@@ -64,8 +140,56 @@ async def friends(user, client, out, args):
 
     try:
 
-        # TODO if repo > 100
-        usernames = await track(username, client, out)
+        if isinstance(args, Namespace):
+            args = vars(args)
+        workers = DEFAULT_PAGE_WORKERS
+        if isinstance(args, dict) and args.get("page_workers"):
+            workers = int(args["page_workers"])
+        usernames = None
+        if isinstance(args, dict) and graphql.use_graphql(args):
+            try:
+                data = await graphql.collect(
+                    username, client, args, ("followers", "following")
+                )
+                usernames = json.dumps(mutual(data["followers"], data["following"]))
+                method = "graphql"
+            except graphql.GraphQLError as e:
+                print(f"GraphQL collector failed, falling back to scraping: {e}")
+        if usernames is None:
+            collected = {}
+            try:
+                usernames = await track(
+                    username,
+                    client,
+                    out,
+                    followers=user.get("followers"),
+                    following=user.get("following"),
+                    workers=workers,
+                    journal=args.get("journal_log") if isinstance(args, dict) else None,
+                    collected=collected,
+                )
+            except BaseException as exc:
+                # Out of time: the mutual friends among the pages scraped so far
+                if budget.cancelled(exc) and collected:
+                    out.append(
+                        {
+                            "name": name,
+                            "domain": domain,
+                            "method": method,
+                            "frequent_rate_limit": frequent_rate_limit,
+                            "rateLimit": False,
+                            "exists": True,
+                            "partial": True,
+                            "data": json.dumps(
+                                mutual(
+                                    collected.get("followers", []),
+                                    collected.get("following", []),
+                                )
+                            ),
+                            "others": None,
+                        }
+                    )
+                raise
 
         out.append(
             {
@@ -1,6 +1,7 @@
 from argparse import Namespace
 
 from gitsint import *
+from gitsint.utils.tokens import auth_headers
 
 
 async def profile(user, client, out, args):
@@ -17,15 +18,19 @@ async def profile(user, client, out, args):
         username = user["login"]
         url = f"https://api.github.com/users/{username}"
         headers = {}
-        if "token" in args and args["token"] != None and args["private"] == True:
+        if "token" in args and args["token"] != None and args.get("private") == True:
             headers = {
                 "Accept": "application/vnd.github+json",
-                "Authorization": "Bearer {}".format("".join(args["token"])),
                 "X-GitHub-Api-Version": "2022-11-28",
+                **auth_headers(args),
             }
             url = f"https://api.github.com/user"
-        r = await client.get(url, headers=headers)
-        res = r.json()
+        if not headers and "id" in user:
+            # Full user object already fetched by gitsint, don't fetch it twice
+            res = user
+        else:
+            r = await client.get(url, headers=headers)
+            res = r.json()
         if "message" in res:
             if res["message"] == "Not Found":
                 out.append(
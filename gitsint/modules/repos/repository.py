@@ -1,15 +1,34 @@
 import argparse
-import concurrent.futures
 import json
 import os
 from collections import Counter
 import logging
-from typing import Tuple, List, Dict
+from typing import Iterable, List, Tuple
 from git import Repo, InvalidGitRepositoryError, NoSuchPathError
 from pathlib import Path          # ✅ nouvel import
 
+import trio
+
 from gitsint import *
-from gitsint.utils import gitleaks
+from gitsint.instruments import timed
+from gitsint.utils import (
+    budget,
+    commit_index,
+    commits,
+    commits_api,
+    filters,
+    gitleaks,
+    graphql,
+    object_cache,
+    repo_state,
+)
+from gitsint.utils.pagination import (
+    DEFAULT_PAGE_WORKERS,
+    fetch_pages,
+    last_page,
+    page_count,
+)
+from gitsint.utils.tokens import auth_headers
 
 logger = logging.getLogger(__name__)
 # Get the directory of the current script file
@@ -18,46 +37,172 @@ current_dir = os.path.dirname(__file__)
 # Navigate from the current directory to the root of your project
 root_dir = os.path.abspath(os.path.join(current_dir, "../../.."))
 
+# Number of repositories cloned / walked at the same time
+DEFAULT_CLONE_WORKERS = 4
+REPOS_PER_PAGE = 100
+
+# `git clone` options of every --clone-mode. Commit extraction only needs
+# commits, so the lighter modes skip blobs and/or the working tree.
+CLONE_MODES = {
+    "full": {},
+    "partial": {"filter": "blob:none", "no_checkout": True},
+    "bare": {"bare": True},
+    "mirror": {"mirror": True},
+}
+
 
 async def fetch_repository(user, client, out, args):
     username = user["login"]
     headers = {}
     repos = []
-    page = 1
 
     # Correction : vérification plus robuste pour le token
     if "token" in args and args["token"] is not None and isinstance(args["token"], (list, tuple)) and len(args["token"]) > 0:
         headers = {
             "Accept": "application/vnd.github+json",
-            "Authorization": f"Bearer {args['token'][0]}",
             "X-GitHub-Api-Version": "2022-11-28",
+            **auth_headers(args),
         }
 
-    if "private" in args and args["private"] is True:
+    if graphql.use_graphql(args):
+        try:
+            data = await graphql.collect(username, client, args, ("repositories",))
+            return data["repositories"]
+        except graphql.GraphQLError as e:
+            print(f"GraphQL collector failed, falling back to REST: {e}")
+
+    private = "private" in args and args["private"] is True
+    if private:
         base_url = "https://api.github.com/user/repos?per_page=100"
     else:
         base_url = f"https://api.github.com/users/{username}/repos?per_page=100"
 
-    while True:
-        url = f"{base_url}&page={page}"
-        response = await client.get(url, headers=headers)
+    response = await client.get(f"{base_url}&page=1", headers=headers)
+    if response.status_code != 200:
+        try:
+            error = response.json()
+        except ValueError:
+            error = None
+        # Let repository() report "Not Found", rate limits, bad credentials..
+        if isinstance(error, dict) and "message" in error:
+            return error
+        return {"message": f"HTTP {response.status_code}"}
+    repos.extend(response.json())
+
+    # Learn the page count up front: from the Link header, or from the
+    # profile counters when the API does not send one.
+    pages = last_page(response)
+    if pages is None and not private:
+        pages = page_count(user.get("public_repos"), REPOS_PER_PAGE)
+
+    if pages is not None:
+        urls = [f"{base_url}&page={page}" for page in range(2, pages + 1)]
+        workers = int(args.get("page_workers") or DEFAULT_PAGE_WORKERS)
+        for response in await fetch_pages(client, urls, headers, workers):
+            if response.status_code == 200:
+                repos.extend(response.json())
+        return repos
+
+    # Unknown page count: keep walking while pages are full
+    page = 2
+    page_data = repos
+    while len(page_data) >= REPOS_PER_PAGE:
+        response = await client.get(f"{base_url}&page={page}", headers=headers)
         if response.status_code != 200:
             break
         page_data = response.json()
-        if not page_data:
-            break
         repos.extend(page_data)
         page += 1
 
     return repos
 
+def _git_env(args: dict) -> dict:
+    """Environment passing the first --token to git, if any"""
+    token = None
+    token_value = args.get("token")
+    if token_value is not None:
+        if isinstance(token_value, (list, tuple)) and len(token_value) > 0:
+            token = token_value[0]
+        else:
+            token = token_value
+
+    if token:
+        return {"GIT_ASKPASS": "echo", "GIT_PASSWORD": token}
+    return {}
+
+
+def _clone_options(args: dict) -> dict:
+    """Build the Repo.clone_from keyword arguments for --clone-mode / --depth"""
+    mode = args.get("clone_mode") or "full"
+    if mode not in CLONE_MODES:
+        raise ValueError(f"Unknown clone mode: {mode}")
+    options = dict(CLONE_MODES[mode])
+
+    depth = int(args.get("depth") or 0)
+    if depth > 0:
+        options["depth"] = depth
+        if mode != "mirror":
+            # --depth implies --single-branch, we still want every branch
+            options["no_single_branch"] = True
+    return options
+
+
+def _merge_messages(messages: commits.MessageBuffer, state: dict):
+    """Add the messages cached in the state of the previous run
+
+    Spilled messages stay in their file: only their count is carried over.
+    """
+    count = messages.count
+    messages.extend(state["messages"])
+    messages.count = count + state.get("message_count", len(state["messages"]))
+
+
+def _message_buffer(args: dict, results_folder: str, repo_name: str, append: bool = False):
+    """MessageBuffer for --messages / --max-messages / --message-length"""
+    mode = args.get("message_mode") or "all"
+    path = None
+    if mode == "spill":
+        path = Path(results_folder) / f"{repo_name}.messages.ndjson"
+    return commits.MessageBuffer(
+        mode,
+        limit=int(args.get("max_messages") or commits.DEFAULT_MAX_MESSAGES),
+        length=int(args.get("message_length") or 0),
+        path=path,
+        append=append,
+    )
+
+
+def _shared_store(repo: dict, args: dict):
+    """Update the --object-cache store of the repository's fork network
+
+    Only used before a new clone. Returns the store path, or None when
+    the cache is off or unusable.
+    """
+    cache_dir = args.get("object_cache")
+    if not cache_dir:
+        return None
+    try:
+        with timed(args.get("profiler"), "phases", "object_cache"):
+            return object_cache.update(
+                os.path.expanduser(cache_dir),
+                repo.get("network") or repo["full_name"],
+                repo["full_name"],
+                repo["clone_url"],
+                _git_env(args),
+                partial=(args.get("clone_mode") or "full") == "partial",
+            )
+    except Exception as e:
+        print(f"Error updating the object cache: {e}")
+        return None
+
+
 def clone_and_collect_data(
     repo: dict,
     username: str,
     args: dict,
     results_folder: str,
     out: list,
-) -> Tuple[dict | None, List[Dict[str, str]]]:
+) -> Tuple[dict | None, List[commits.Identity]]:
     if repo is None:
         print("Error: repo is None!")
         return None, []
@@ -80,28 +225,39 @@ def clone_and_collect_data(
         print(f"Repo path: {repo_path}")
 
         try:
+            state = None
             if repo_path.exists():
                 repo_obj = Repo(repo_path)
+                state = repo_state.load_state(repo_path)
+                try:
+                    with timed(args.get("profiler"), "phases", "fetch"):
+                        repo_state.refresh(repo_obj, _git_env(args))
+                    print(f"Fetched repo {repo_path}")
+                except Exception as e:
+                    print(f"Error fetching repo: {e}")
             else:
                 clone_kwargs = {}
-                token = None
-                token_value = args.get("token")
-                if token_value is not None:
-                    if isinstance(token_value, (list, tuple)) and len(token_value) > 0:
-                        token = token_value[0]
-                    else:
-                        token = token_value
-
-                if token:
-                    clone_kwargs["env"] = {"GIT_ASKPASS": "echo", "GIT_PASSWORD": token}
+                env = _git_env(args)
+                if env:
+                    clone_kwargs["env"] = env
 
                 clone_url = repo.get('clone_url')
                 if clone_url is None:
                     print("Error: clone_url is None")
                     return None, []
 
+                clone_kwargs.update(_clone_options(args))
+                # Shared history of the fork network is only fetched once.
+                # Existing clones are refreshed on their own, they do not
+                # borrow from the store.
+                store = _shared_store(repo, args)
+                if store is not None:
+                    # Borrow the objects of the store through alternates
+                    clone_kwargs["reference"] = str(store)
+
                 try:
-                    repo_obj = Repo.clone_from(clone_url, repo_path, **clone_kwargs)
+                    with timed(args.get("profiler"), "phases", "clone"):
+                        repo_obj = Repo.clone_from(clone_url, repo_path, **clone_kwargs)
                     print(f"Cloned repo to {repo_path}")
                 except Exception as e:
                     print(f"Error cloning repo: {e}")
@@ -112,8 +268,45 @@ def clone_and_collect_data(
                 return None, []
 
             print("Extracting commits...")
-            authors, messages = _extract_commits(repo_obj)
-            print(f"Extracted {len(authors)} authors and {len(messages)} messages")
+            refs = repo_state.current_refs(repo_obj)
+            mode = args.get("message_mode") or "all"
+            if state is not None and state.get("messages_mode", "all") != mode:
+                # Cached messages were kept another way: walk everything again
+                state = None
+            unchanged = state is not None and state["refs"] == refs
+            known = []
+            if state is not None and not unchanged:
+                known = repo_state.existing_commits(repo_path, state["refs"].values())
+            # Spilled messages of the previous runs stay in their file
+            messages = _message_buffer(
+                args, results_folder, repo_name, append=unchanged or bool(known)
+            )
+            try:
+                with timed(args.get("profiler"), "phases", "extract"):
+                    if unchanged:
+                        authors = list(state["authors"])
+                        _merge_messages(messages, state)
+                    else:
+                        # Only walk the commits that were not processed last time
+                        authors, _ = _extract_commits(
+                            repo_obj,
+                            exclude=known,
+                            engine=args.get("commit_engine") or "git",
+                            messages=messages,
+                            index=args.get("seen_commits"),
+                            network=repo.get("network") or repo["full_name"],
+                        )
+                        if known:
+                            seen = set(authors)
+                            authors = authors + [a for a in state["authors"] if a not in seen]
+                            _merge_messages(messages, state)
+            finally:
+                messages.close()
+            if not unchanged:
+                repo_state.save_state(
+                    repo_path, refs, authors, messages.values(), mode, messages.count
+                )
+            print(f"Extracted {len(authors)} authors and {messages.count} messages")
 
             if not isinstance(authors, list):
                 print(f"Error: authors is not a list, it's {type(authors)}")
@@ -124,8 +317,8 @@ def clone_and_collect_data(
                 if a is None:
                     print("Warning: found None in authors list")
                     continue
-                if not isinstance(a, dict):
-                    print(f"Warning: author is not a dict: {a}")
+                if not isinstance(a, commits.Identity):
+                    print(f"Warning: author is not an Identity: {a}")
                     continue
                 valid_authors.append(a)
             authors = valid_authors
@@ -134,13 +327,12 @@ def clone_and_collect_data(
                 response_data = {
                     "name": repo.get("name"),
                     "description": repo.get("description"),
-                    "authors": json.dumps(authors),
-                    "emails": json.dumps(
-                        [a.get("email", "unknown@example.com") for a in authors]
-                        if authors else []
-                    ),
-                    "messages": json.dumps(messages),
+                    "authors": json.dumps([a.as_dict() for a in authors]),
+                    "emails": json.dumps([a.email for a in authors]),
+                    "messages": json.dumps(messages.values()),
                 }
+                if messages.path is not None:
+                    response_data["messages_file"] = str(messages.path)
                 print("Response data constructed successfully")
                 return response_data, authors
             except Exception as e:
@@ -159,28 +351,66 @@ def clone_and_collect_data(
 
 
 
-def _extract_commits(repo_obj: Repo) -> Tuple[List[dict], List[str]]:
-    authors = []
-    messages = []
+def _extract_commits(
+    repo_obj: Repo,
+    exclude: Iterable[str] = (),
+    engine: str = "git",
+    messages: commits.MessageBuffer | None = None,
+    index: commit_index.CommitIndex | None = None,
+    network: str | None = None,
+) -> Tuple[List[commits.Identity], List[str]]:
+    """Walk every commit of every ref, skipping history reachable from `exclude`
+
+    The default engine parses a single `git log` stream, GitPython is used
+    when asked for or when `git log` fails. With a commit `index`, commits
+    already read from another repository of the fork `network` are not
+    parsed again.
+    """
+    if engine == "git":
+        try:
+            if index is not None and network:
+                return commit_index.extract_commits_indexed(
+                    repo_obj.git_dir, index, network, exclude, messages
+                )
+            return commits.extract_commits(repo_obj.git_dir, exclude, messages)
+        except commits.GitLogError as e:
+            print(f"git log failed, falling back to GitPython: {e}")
+            # Messages streamed before the failure would be counted twice
+            if messages is not None:
+                messages.reset()
+    return _extract_commits_gitpython(repo_obj, exclude, messages)
+
+
+def _extract_commits_gitpython(
+    repo_obj: Repo,
+    exclude: Iterable[str] = (),
+    messages: commits.MessageBuffer | None = None,
+) -> Tuple[List[commits.Identity], List[str]]:
+    authors = {}
+    messages = messages if messages is not None else commits.MessageBuffer()
+    exclude = list(exclude)
+    if exclude:
+        commit_iter = repo_obj.iter_commits(["--all", "--not", *exclude])
+    else:
+        commit_iter = repo_obj.iter_commits(all=True)
     try:
-        for commit in repo_obj.iter_commits(all=True):
+        for commit in commit_iter:
             try:
                 author_name = commit.author.name if commit.author and commit.author.name else "Unknown"
                 author_email = commit.author.email if commit.author and commit.author.email else "unknown@example.com"
-                author = {"name": author_name, "email": author_email}
             except AttributeError:
-                author = {"name": "Unknown", "email": "unknown@example.com"}
+                author_name, author_email = "Unknown", "unknown@example.com"
 
-            if author not in authors:
-                authors.append(author)
+            key = (author_name, author_email)
+            if key not in authors:
+                authors[key] = commits.Identity(author_name, author_email)
 
             message = commit.message.strip() if commit.message else ""
-            messages.append(message)
+            messages.add(message)
     except Exception as e:
         print(f"Error extracting commits: {e}")
 
-    return authors, messages
-
+    return list(authors.values()), messages.values()
 
 
 async def repository(user, client, out, args):
@@ -246,6 +476,20 @@ async def repository(user, client, out, args):
                         "data": None,
                     }
                 )
+            else:
+                out.append(
+                    {
+                        "name": name,
+                        "domain": domain,
+                        "method": method,
+                        "frequent_rate_limit": frequent_rate_limit,
+                        "rateLimit": False,
+                        "error": True,
+                        "exists": False,
+                        "others": {"Message": message, "errorMessage": message},
+                        "data": None,
+                    }
+                )
         else:
             RESULTS_FOLDER = (
                 os.path.join(args["output"], username)
@@ -254,14 +498,8 @@ async def repository(user, client, out, args):
             )
             os.makedirs(RESULTS_FOLDER, exist_ok=True)
 
-            if "fork" in args and not args["fork"]:
-                repos = [repo for repo in repos if not repo["fork"]]
-            if "size" in args and int(args["size"]) > 0:
-                repos = [
-                    repo for repo in repos if 0 < int(repo["size"]) < int(args["size"])
-                ]
-            else:
-                repos = [repo for repo in repos if 0 < int(repo["size"]) < 500000]
+            # Only pay the clone cost for the repositories that matter
+            repos = filters.filter_repositories(repos, args)
             if len(repos) < 1:
                 out.append(
                     {
@@ -280,50 +518,149 @@ async def repository(user, client, out, args):
                 )
                 return
 
-            _repos = []
-            _authors = []
+            # Every repository is reported as soon as it is processed, only
+            # the deduplicated identities are kept until the end.
+            unique_authors = {}
 
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-
-                future_to_repo = {
-                        executor.submit(
-                        clone_and_collect_data,
-                        repo,
+            # Clones and commit walks are blocking git I/O: run them in worker
+            # threads so the other modules keep making progress on the loop.
+            limiter = args.get("clone_limiter") or trio.CapacityLimiter(
+                int(args.get("clone_workers") or DEFAULT_CLONE_WORKERS)
+            )
 
-                        username,
-                        args,
-                        RESULTS_FOLDER,
-                        out,            # ⬅️ dernier param.
-                    ): repo
-                    for repo in repos
-                }
-                for future in concurrent.futures.as_completed(future_to_repo):
-                    repo = future_to_repo[future]
-                    try:
-                        repo_data, authors_data = future.result()
-                        if repo_data:
-                            _repos.append(repo_data)
-                        if authors_data:
-                            _authors.extend(authors_data)
-                    except Exception as exc:
-                        print("Exc in future", exc)
-                        out.append(
-                            {
-                                "name": name,
-                                "domain": domain,
-                                "method": method,
-                                "frequent_rate_limit": frequent_rate_limit,
-                                "rateLimit": False,
-                                "exists": True,
-                                "others": {
-                                    "Message": "Error processing repository.",
-                                    "errorMessage": str(exc),
-                                },
-                                "data": None,
-                            }
+            # Repositories above the clone size cap are read through the API
+            size_cap = filters.max_size(args)
+
+            journal = args.get("journal_log")
+            # Records of the repositories done by a previous run of the scan
+            # are only replayed, not streamed again
+            replay = getattr(out, "replay", out.append)
+
+            async def process_repo(repo):
+                done = journal.repo(username, repo["full_name"]) if journal else None
+                if done is not None:
+                    if done["record"]:
+                        replay(done["record"])
+                    for author in map(commits.Identity.from_dict, done["authors"]):
+                        unique_authors.setdefault(author, author)
+                    if done["cloned"] and args.get("gitleaks"):
+                        nursery.start_soon(scan_leaks, repo)
+                    return
+                try:
+                    cloned = not args.get("commits_api") and int(repo["size"]) < size_cap
+                    if cloned:
+                        if args.get("object_cache") or args.get("commit_index"):
+                            network = await object_cache.resolve_network(repo, client, args)
+                            repo = dict(repo, network=network)
+                        repo_data, authors_data = await trio.to_thread.run_sync(
+                            clone_and_collect_data,
+                            repo,
+                            username,
+                            args,
+                            RESULTS_FOLDER,
+                            out,
+                            limiter=limiter,
+                            # Do not hold a --deadline on a slow clone, the
+                            # thread keeps its clone slot until it is done
+                            abandon_on_cancel=True,
                         )
+                    else:
+                        with timed(args.get("profiler"), "phases", "commits_api"):
+                            repo_data, authors_data = await commits_api.collect_commits_api(
+                                repo,
+                                client,
+                                args,
+                                messages=_message_buffer(args, RESULTS_FOLDER, repo["name"]),
+                            )
+                    record = None
+                    if repo_data:
+                        record = {
+                            "name": "repository",
+                            "domain": domain,
+                            "method": method,
+                            "frequent_rate_limit": frequent_rate_limit,
+                            "rateLimit": False,
+                            "exists": True,
+                            "others": None,
+                            "data": json.dumps([repo_data]),
+                        }
+                        out.append(record)
+                        if cloned and args.get("gitleaks"):
+                            # Scan this clone while the others are still cloning
+                            nursery.start_soon(scan_leaks, repo)
+                    for author in authors_data or []:
+                        unique_authors.setdefault(author, author)
+                    if journal is not None:
+                        journal.repo_done(
+                            username, repo["full_name"], record, authors_data or [], cloned
+                        )
+                except Exception as exc:
+                    print("Exc in clone worker", exc)
+                    out.append(
+                        {
+                            "name": name,
+                            "domain": domain,
+                            "method": method,
+                            "frequent_rate_limit": frequent_rate_limit,
+                            "rateLimit": False,
+                            "exists": True,
+                            "others": {
+                                "Message": "Error processing repository.",
+                                "errorMessage": str(exc),
+                            },
+                            "data": None,
+                        }
+                    )
+
+            gitleaks_limiter = args.get("gitleaks_limiter") or trio.CapacityLimiter(
+                int(args.get("gitleaks_workers") or gitleaks.DEFAULT_GITLEAKS_WORKERS)
+            )
+
+            async def scan_leaks(repo):
+                repo_path = Path(RESULTS_FOLDER) / repo["name"]
+                report_path = Path(RESULTS_FOLDER) / f"{repo['name']}.gitleaks.json"
+                leaks = await gitleaks.run_gitleaks_scan_async(
+                    repo_path, report_path, gitleaks_limiter, args.get("profiler")
+                )
+                if leaks:
+                    out.append(
+                        {
+                            "name": "gitleaks",
+                            "domain": "gitleaks",
+                            "method": "gitleaks",
+                            "frequent_rate_limit": False,
+                            "rateLimit": False,
+                            "exists": True,
+                            "others": None,
+                            "data": json.dumps(
+                                [{"repository": repo["full_name"], "leaks": leaks}]
+                            ),
+                        }
+                    )
 
-            if not _authors:
+            try:
+                async with trio.open_nursery() as nursery:
+                    for repo in repos:
+                        nursery.start_soon(process_repo, repo)
+            except BaseException as exc:
+                # Out of time: keep the authors of the repositories done so far
+                if budget.cancelled(exc) and unique_authors:
+                    out.append(
+                        {
+                            "name": "repository",
+                            "domain": domain,
+                            "method": method,
+                            "frequent_rate_limit": frequent_rate_limit,
+                            "rateLimit": False,
+                            "exists": True,
+                            "partial": True,
+                            "others": None,
+                            "data": json.dumps([a.as_dict() for a in unique_authors.values()]),
+                        }
+                    )
+                raise
+
+            if not unique_authors:
                 out.append(
                     {
                         "name": name,
@@ -336,29 +673,11 @@ async def repository(user, client, out, args):
                             "Message": "No authors or emails found for this user.",
                             "errorMessage": "No authors or emails found for this user.",
                         },
-                        "data": json.dumps(_repos),
+                        "data": None,
                     }
                 )
             else:
-                # Remove duplicate authors
-                authors = []
-                for _auth in _authors:
-                    if _auth not in authors:
-                        authors.append(_auth)
-
-                out.append(
-                    {
-                        "name": "repository",
-                        "domain": domain,
-                        "method": method,
-                        "frequent_rate_limit": frequent_rate_limit,
-                        "rateLimit": False,
-                        "exists": True,
-                        "others": None,
-                        "data": json.dumps(_repos),
-                    }
-                )
-
+                authors = [a.as_dict() for a in unique_authors.values()]
                 out.append(
                     {
                         "name": "repository",
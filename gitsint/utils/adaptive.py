@@ -0,0 +1,170 @@
+import random
+
+import httpx
+import trio
+
+# Concurrency of a host before any feedback, and its bounds
+DEFAULT_INITIAL_CONCURRENCY = 8
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_RETRIES = 3
+# First backoff delay and the cap of the exponential backoff, in seconds
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+# A response slower than LATENCY_FACTOR times the best latency seen is
+# not healthy enough to grow the concurrency
+LATENCY_FACTOR = 2.0
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit of the requests sent to one host
+
+    Every `limit` healthy responses grow the limit by one, an overload
+    halves it, at most once per cooldown so that a burst of failures of
+    requests sent together only counts once.
+    """
+
+    def __init__(self, initial, maximum, minimum=1):
+        self.maximum = max(minimum, maximum)
+        self.minimum = minimum
+        self.limiter = trio.CapacityLimiter(min(max(minimum, initial), self.maximum))
+        self.successes = 0
+        self.best = None
+        self.cooldown_until = 0.0
+        self.resume_at = 0.0
+
+    @property
+    def limit(self):
+        return self.limiter.total_tokens
+
+    def on_success(self, elapsed):
+        if self.best is None or elapsed < self.best:
+            self.best = elapsed
+        if elapsed > LATENCY_FACTOR * self.best:
+            return
+        self.successes += 1
+        if self.successes >= self.limit and self.limit < self.maximum:
+            self.limiter.total_tokens = self.limit + 1
+            self.successes = 0
+
+    def on_overload(self, elapsed=0.0):
+        now = trio.current_time()
+        self.successes = 0
+        if now < self.cooldown_until:
+            return
+        self.limiter.total_tokens = max(self.minimum, self.limit // 2)
+        self.cooldown_until = now + max(1.0, elapsed)
+
+    def pause(self, seconds):
+        """Hold every request to this host for `seconds` (Retry-After)"""
+        self.resume_at = max(self.resume_at, trio.current_time() + seconds)
+
+    async def wait(self):
+        delay = self.resume_at - trio.current_time()
+        if delay > 0:
+            await trio.sleep(delay)
+
+
+def retry_after(response):
+    """Seconds asked by a Retry-After header, if any"""
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+async def is_overloaded(response):
+    """429, 5xx from an overloaded server, or a GitHub secondary rate limit
+
+    Primary rate limits (no budget left on the token) are not overloads:
+    they are left to the token pool.
+    """
+    if response.status_code in RETRY_STATUSES:
+        return True
+    if response.status_code != 403 or response.headers.get("x-ratelimit-remaining") == "0":
+        return False
+    if "retry-after" in response.headers:
+        return True
+    await response.aread()
+    return "secondary rate limit" in response.text.lower()
+
+
+class AdaptiveTransport(httpx.AsyncBaseTransport):
+    """Cap the requests in flight per host with an AIMD limit, retry overloads
+
+    Concurrency grows while responses stay fast and successful and is
+    halved on 429s, secondary rate limits, 5xx and transport errors.
+    Idempotent requests are retried, after the Retry-After delay when
+    one is given (every request to the host waits), otherwise after a
+    jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        transport,
+        initial=DEFAULT_INITIAL_CONCURRENCY,
+        maximum=DEFAULT_MAX_CONCURRENCY,
+        retries=DEFAULT_RETRIES,
+        backoff=BACKOFF_BASE,
+        profiler=None,
+    ):
+        self.transport = transport
+        self.initial = initial
+        self.maximum = maximum
+        self.retries = retries
+        self.backoff = backoff
+        self.profiler = profiler
+        self.hosts = {}
+
+    def limiter(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = AdaptiveLimiter(self.initial, self.maximum)
+        return self.hosts[host]
+
+    def delay(self, attempt):
+        # "Full jitter": spread the retries of requests that failed together
+        return random.uniform(0, min(BACKOFF_MAX, self.backoff * 2**attempt))
+
+    async def handle_async_request(self, request):
+        state = self.limiter(request.url.host)
+        retry = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            await state.wait()
+            async with state.limiter:
+                start = trio.current_time()
+                try:
+                    response = await self.transport.handle_async_request(request)
+                except httpx.TransportError:
+                    state.on_overload(trio.current_time() - start)
+                    if not retry or attempt >= self.retries:
+                        raise
+                    response = None
+                elapsed = trio.current_time() - start
+
+            if response is not None:
+                if not await is_overloaded(response):
+                    state.on_success(elapsed)
+                    return response
+                state.on_overload(elapsed)
+                if not retry or attempt >= self.retries:
+                    return response
+                await response.aclose()
+
+            delay = retry_after(response) if response is not None else None
+            if delay is not None:
+                state.pause(delay)
+            else:
+                delay = self.delay(attempt)
+            attempt += 1
+            if self.profiler is not None:
+                self.profiler.record("rate_limit", f"backoff {request.url.host}", delay)
+            await trio.sleep(delay)
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,62 @@
+import math
+
+import trio
+
+# Key of the budget applied to the modules without their own
+ALL_MODULES = "*"
+
+
+def parse_budgets(specs):
+    """Parse --module-budget values: "SECONDS" for every module or "MODULE=SECONDS"
+
+    Raises ValueError on a malformed value.
+    """
+    budgets = {}
+    for spec in specs or []:
+        name, _, seconds = spec.rpartition("=")
+        try:
+            value = float(seconds)
+        except ValueError:
+            raise ValueError(f"Invalid module budget: {spec}") from None
+        if value <= 0:
+            raise ValueError(f"Invalid module budget: {spec}")
+        budgets[name or ALL_MODULES] = value
+    return budgets
+
+
+def module_deadline(budgets, name, start, deadline=math.inf):
+    """Deadline of one module run: its budget from `start`, within the target `deadline`"""
+    budget = budgets.get(name, budgets.get(ALL_MODULES)) if budgets else None
+    if budget is None:
+        return deadline
+    return min(deadline, start + budget)
+
+
+def cancelled(exc):
+    """True for a trio.Cancelled, or an exception group made only of them
+
+    Nurseries wrap the cancellation of their children in a group.
+    """
+    if isinstance(exc, trio.Cancelled):
+        return True
+    group = getattr(exc, "exceptions", None)
+    return bool(group) and all(cancelled(e) for e in group)
+
+
+def partial_record(name, domain, method="api"):
+    """Record telling that a module ran out of time before finishing"""
+    return {
+        "name": name,
+        "domain": domain,
+        "method": method,
+        "frequent_rate_limit": False,
+        "rateLimit": False,
+        "exists": False,
+        "error": False,
+        "partial": True,
+        "others": {
+            "Message": "Time budget expired, results are partial",
+            "errorMessage": "Time budget expired, results are partial",
+        },
+        "data": None,
+    }
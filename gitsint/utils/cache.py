@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import httpx
+import trio
+
+# Default size bound of the on-disk cache, in bytes
+DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+
+# Headers of a 304 that must not replace the ones of the cached response
+BODY_HEADERS = {"content-length", "content-type", "content-encoding", "transfer-encoding"}
+
+
+def cache_key(request, credential=None):
+    """Key a request on its URL and the credentials / media type it uses
+
+    `credential` replaces the Authorization header when a transport under
+    the cache authenticates the request.
+    """
+    if credential is None:
+        credential = request.headers.get("authorization", "")
+    parts = [
+        request.method,
+        str(request.url),
+        credential,
+        request.headers.get("accept", ""),
+    ]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+class CacheTransport(httpx.AsyncBaseTransport):
+    """On-disk HTTP cache revalidating entries with ETag / Last-Modified
+
+    GET responses carrying a validator are stored (raw body + headers).
+    Entries younger than `ttl` seconds are served without any request,
+    older ones are revalidated with If-None-Match / If-Modified-Since and
+    a 304 is answered from disk. Entries are evicted least recently used
+    first once the cache grows past `max_size` bytes.
+
+    `auth` is the TokenPoolTransport under the cache, if any: the tokens it
+    authenticates a request with are part of its key.
+
+    The disk is only read and written from worker threads, never on the
+    event loop; `lock` guards the size / last-use index they share.
+    """
+
+    def __init__(self, transport, cache_dir, ttl=0, max_size=DEFAULT_MAX_SIZE, auth=None):
+        self.transport = transport
+        self.auth = auth
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_size = max_size
+        self.index = None
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    async def handle_async_request(self, request):
+        if request.method != "GET":
+            return await self.transport.handle_async_request(request)
+
+        key = cache_key(request, self.auth.credential(request) if self.auth else None)
+        entry = await trio.to_thread.run_sync(self.load, key)
+        if entry is not None:
+            meta, body = entry
+            if time.time() - meta["stored_at"] < self.ttl:
+                await trio.to_thread.run_sync(self.touch, key)
+                return self.build_response(meta, body, request)
+            if meta.get("etag"):
+                request.headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request.headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = await self.transport.handle_async_request(request)
+
+        if response.status_code == 304 and entry is not None:
+            await response.aclose()
+            meta, body = entry
+            headers = [
+                [k, v] for k, v in meta["headers"]
+                if k.lower() not in response.headers or k.lower() in BODY_HEADERS
+            ]
+            headers += [
+                [k, v] for k, v in response.headers.multi_items()
+                if k.lower() not in BODY_HEADERS
+            ]
+            meta["headers"] = headers
+            meta["stored_at"] = time.time()
+            await trio.to_thread.run_sync(self.save, key, meta, body)
+            return self.build_response(meta, body, request)
+
+        validator = response.headers.get("etag") or response.headers.get("last-modified")
+        if response.status_code != 200 or not (validator or self.ttl > 0):
+            return response
+
+        body = b"".join([chunk async for chunk in response.stream])
+        await response.aclose()
+        meta = {
+            "url": str(request.url),
+            "status": response.status_code,
+            "headers": [[k, v] for k, v in response.headers.multi_items()],
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "stored_at": time.time(),
+        }
+        await trio.to_thread.run_sync(self.save, key, meta, body)
+        return self.build_response(meta, body, request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+    def build_response(self, meta, body, request):
+        return httpx.Response(
+            meta["status"],
+            headers=meta["headers"],
+            content=body,
+            request=request,
+        )
+
+    def paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".body"
+
+    def load(self, key):
+        meta_path, body_path = self.paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf8") as meta_file:
+                meta = json.load(meta_file)
+            with open(body_path, "rb") as body_file:
+                body = body_file.read()
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def save(self, key, meta, body):
+        meta_path, body_path = self.paths(key)
+        try:
+            with open(body_path, "wb") as body_file:
+                body_file.write(body)
+            with open(meta_path, "w", encoding="utf8") as meta_file:
+                json.dump(meta, meta_file)
+        except OSError as e:
+            print(f"Error writing HTTP cache: {e}")
+            return
+        with self.lock:
+            self.load_index()
+            self.index[key] = [len(body), time.time()]
+            self.evict()
+
+    def touch(self, key):
+        with self.lock:
+            self.load_index()
+            if key not in self.index:
+                return
+            self.index[key][1] = time.time()
+        try:
+            os.utime(self.paths(key)[0])
+        except OSError:
+            pass
+
+    def load_index(self):
+        """Build the size / last-use index from the files, once, under `lock`"""
+        if self.index is not None:
+            return
+        self.index = {}
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(".body"):
+                continue
+            key = filename[: -len(".body")]
+            meta_path, body_path = self.paths(key)
+            try:
+                self.index[key] = [
+                    os.path.getsize(body_path),
+                    os.path.getmtime(meta_path),
+                ]
+            except OSError:
+                continue
+
+    def evict(self):
+        """Drop the least recently used entries, under `lock`"""
+        total = sum(size for size, _ in self.index.values())
+        if total <= self.max_size:
+            return
+        for key, (size, _) in sorted(self.index.items(), key=lambda i: i[1][1]):
+            for path in self.paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            del self.index[key]
+            total -= size
+            if total <= self.max_size:
+                break
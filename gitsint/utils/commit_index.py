@@ -0,0 +1,155 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from gitsint.utils.commits import (
+    UNKNOWN_EMAIL,
+    UNKNOWN_NAME,
+    Identity,
+    MessageBuffer,
+    iter_log,
+    rev_list,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS identities (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    UNIQUE (name, email)
+);
+CREATE TABLE IF NOT EXISTS commits (
+    network TEXT NOT NULL,
+    sha BLOB NOT NULL,
+    identity INTEGER NOT NULL REFERENCES identities(id),
+    message TEXT NOT NULL,
+    PRIMARY KEY (network, sha)
+) WITHOUT ROWID;
+"""
+
+# Fork networks kept in memory at the same time
+DEFAULT_NETWORKS = 4
+
+
+class CommitIndex:
+    """Seen-set of the commits already read, per fork network, keyed by SHA
+
+    Forks share most of their history: once a commit has been read from
+    one repository of a network, the others get its author and message
+    from here instead of parsing it again. Commits are stored in SQLite
+    (":memory:" to only share them within a scan) and the commits of the
+    most recently used networks are held in memory.
+    """
+
+    def __init__(self, path, networks=DEFAULT_NETWORKS):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        # id -> Identity, the identities table stays small
+        self.identities = {
+            id_: Identity(name, email)
+            for id_, name, email in self.conn.execute("SELECT id, name, email FROM identities")
+        }
+        self.identity_ids = {
+            (identity.name, identity.email): id_ for id_, identity in self.identities.items()
+        }
+        self.networks = networks
+        # network -> {sha: (Identity, message)}, least recently used first
+        self.loaded = OrderedDict()
+        self.network_locks = {}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def network_lock(self, network):
+        """Held while a repository of `network` is processed, so its forks
+        find the commits it added"""
+        with self.lock:
+            return self.network_locks.setdefault(network, threading.Lock())
+
+    def commits(self, network):
+        """Known commits of a network: {sha: (Identity, message)}"""
+        with self.lock:
+            if network in self.loaded:
+                self.loaded.move_to_end(network)
+                return self.loaded[network]
+            # One range scan of the primary key
+            known = {
+                sha.hex(): (self.identities[identity], message)
+                for sha, identity, message in self.conn.execute(
+                    "SELECT sha, identity, message FROM commits WHERE network = ?",
+                    (network,),
+                )
+            }
+            self.loaded[network] = known
+            while len(self.loaded) > self.networks:
+                self.loaded.popitem(last=False)
+            return known
+
+    def add(self, network, commits):
+        """Record (sha, name, email, message) rows read from a repository of `network`"""
+        known = self.commits(network)
+        with self.lock, self.conn:
+            rows = []
+            for sha, name, email, message in commits:
+                key = (name, email)
+                if key not in self.identity_ids:
+                    cursor = self.conn.execute(
+                        "INSERT INTO identities (name, email) VALUES (?, ?) "
+                        "ON CONFLICT(name, email) DO UPDATE SET name = excluded.name "
+                        "RETURNING id",
+                        key,
+                    )
+                    id_ = cursor.fetchone()[0]
+                    self.identity_ids[key] = id_
+                    self.identities[id_] = Identity(name, email)
+                id_ = self.identity_ids[key]
+                known[sha] = (self.identities[id_], message)
+                rows.append((network, bytes.fromhex(sha), id_, message))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO commits (network, sha, identity, message) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+
+def extract_commits_indexed(repo_path, index, network, exclude=(), messages=None):
+    """extract_commits, only parsing the commits missing from `index`
+
+    The SHAs of the repository are listed with `git rev-list`, the known
+    ones come from the commits of its fork `network` and the others are
+    read with a single `git log --no-walk` then added to it. The first
+    repository of a network is walked as usual. Authors and messages are
+    the same, in the same order, as a full walk.
+    """
+    messages = messages if messages is not None else MessageBuffer()
+    with index.network_lock(network):
+        known = index.commits(network)
+        if not known:
+            # Nothing to reuse: a plain walk, recorded for the next forks
+            commits = [
+                (sha, name or UNKNOWN_NAME, email or UNKNOWN_EMAIL, message)
+                for sha, name, email, message in iter_log(repo_path, exclude)
+            ]
+            shas = [commit[0] for commit in commits]
+        else:
+            shas = rev_list(repo_path, exclude)
+            missing = [sha for sha in shas if sha not in known]
+            commits = [
+                (sha, name or UNKNOWN_NAME, email or UNKNOWN_EMAIL, message)
+                for sha, name, email, message in iter_log(repo_path, revisions=missing)
+            ]
+        if commits:
+            index.add(network, commits)
+            known = index.commits(network)
+        del commits
+
+        identities = {}
+        for sha in shas:
+            identity, message = known[sha]
+            identities.setdefault((identity.name, identity.email), identity)
+            messages.add(message)
+    return list(identities.values()), messages.values()
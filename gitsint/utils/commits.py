@@ -0,0 +1,209 @@
+import json
+import random
+import subprocess
+import sys
+
+# One commit = 4 NUL separated fields, `-z` also ends every commit with a NUL
+LOG_FORMAT = "%H%x00%an%x00%ae%x00%B"
+LOG_FIELDS = 4
+CHUNK_SIZE = 1 << 16
+
+UNKNOWN_NAME = "Unknown"
+UNKNOWN_EMAIL = "unknown@example.com"
+
+MESSAGE_MODES = ("all", "sample", "spill", "none")
+# Messages kept per repository by the "sample" mode
+DEFAULT_MAX_MESSAGES = 1000
+
+
+class Identity:
+    """A commit author, with interned strings shared by every repository
+
+    Authors stay Identity objects until they are serialized with as_dict().
+    """
+
+    __slots__ = ("name", "email")
+
+    def __init__(self, name, email):
+        self.name = sys.intern(name or UNKNOWN_NAME)
+        self.email = sys.intern(email or UNKNOWN_EMAIL)
+
+    @classmethod
+    def from_dict(cls, author):
+        return cls(author.get("name"), author.get("email"))
+
+    def as_dict(self):
+        return {"name": self.name, "email": self.email}
+
+    def __eq__(self, other):
+        if not isinstance(other, Identity):
+            return NotImplemented
+        return self.name == other.name and self.email == other.email
+
+    def __hash__(self):
+        return hash((self.name, self.email))
+
+    def __repr__(self):
+        return f"Identity({self.name!r}, {self.email!r})"
+
+
+class MessageBuffer:
+    """Bounded store of the commit messages of one repository
+
+    Modes: "all" keeps every message, "sample" keeps a uniform sample of
+    `limit` messages (reservoir sampling), "spill" streams them to a
+    NDJSON file at `path` and "none" only counts them. Messages longer
+    than `length` characters are truncated when `length` is set.
+    """
+
+    def __init__(self, mode="all", limit=DEFAULT_MAX_MESSAGES, length=0, path=None, append=False):
+        if mode not in MESSAGE_MODES:
+            raise ValueError(f"Unknown message mode: {mode}")
+        if mode == "spill" and path is None:
+            raise ValueError("The spill message mode needs a path")
+        self.mode = mode
+        self.limit = max(0, limit)
+        self.length = length
+        self.path = path
+        self.count = 0
+        self.kept = []
+        self.random = random.Random(0)
+        self.file = open(path, "a" if append else "w", encoding="utf8") if mode == "spill" else None
+        # Spilled messages before this position were kept by previous runs
+        self.start = self.file.tell() if self.file is not None else 0
+
+    def add(self, message):
+        if self.length and len(message) > self.length:
+            message = message[: self.length]
+        self.count += 1
+        if self.mode == "all":
+            self.kept.append(message)
+        elif self.mode == "sample":
+            if len(self.kept) < self.limit:
+                self.kept.append(message)
+            else:
+                index = self.random.randrange(self.count)
+                if index < self.limit:
+                    self.kept[index] = message
+        elif self.mode == "spill":
+            self.file.write(json.dumps(message) + "\n")
+
+    def extend(self, messages):
+        for message in messages:
+            self.add(message)
+
+    def values(self):
+        return self.kept
+
+    def reset(self):
+        """Drop every message added so far, e.g. before walking again"""
+        self.count = 0
+        self.kept = []
+        self.random = random.Random(0)
+        if self.file is not None:
+            self.file.seek(self.start)
+            self.file.truncate()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class GitLogError(Exception):
+    """`git log` could not be run or exited with an error"""
+
+
+def iter_log(repo_path, exclude=(), revisions=None):
+    """Stream (sha, name, email, message) for every commit of every ref
+
+    The output of a single `git log --all -z` process is parsed chunk by
+    chunk, commits reachable from the `exclude` SHAs are skipped.
+    With `revisions`, only these commits are read, in the given order.
+    """
+    command = ["git", "-C", str(repo_path), "log", "-z"]
+    command.append(f"--format={LOG_FORMAT}")
+    if revisions is not None:
+        stdin = [f"{sha}\n" for sha in revisions]
+        if not stdin:
+            return
+        command.append("--no-walk=unsorted")
+    else:
+        # Too many SHAs for a command line: negate them on stdin
+        stdin = [f"^{sha}\n" for sha in exclude]
+        command.append("--all")
+    if stdin:
+        command.append("--stdin")
+    try:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if stdin else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    except OSError as e:
+        raise GitLogError(str(e)) from e
+
+    try:
+        if stdin:
+            process.stdin.write("".join(stdin).encode())
+            process.stdin.close()
+
+        fields = []
+        pending = b""
+        while True:
+            chunk = process.stdout.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parts = (pending + chunk).split(b"\0")
+            pending = parts.pop()
+            for part in parts:
+                fields.append(part.decode("utf8", errors="replace"))
+                if len(fields) == LOG_FIELDS:
+                    sha, name, email, message = fields
+                    fields = []
+                    yield sha.strip(), name, email, message.strip()
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode("utf8", errors="replace")
+        process.stderr.close()
+        returncode = process.wait()
+
+    if returncode != 0:
+        raise GitLogError(stderr.strip() or f"git log exited with {returncode}")
+
+
+def rev_list(repo_path, exclude=()):
+    """SHAs of every commit of every ref, in `git log --all` order"""
+    command = ["git", "-C", str(repo_path), "rev-list", "--all"]
+    exclude = list(exclude)
+    if exclude:
+        command.append("--stdin")
+    try:
+        process = subprocess.run(
+            command,
+            input="".join(f"^{sha}\n" for sha in exclude).encode(),
+            capture_output=True,
+        )
+    except OSError as e:
+        raise GitLogError(str(e)) from e
+    if process.returncode != 0:
+        stderr = process.stderr.decode("utf8", errors="replace")
+        raise GitLogError(stderr.strip() or f"git rev-list exited with {process.returncode}")
+    return process.stdout.decode().split()
+
+
+def extract_commits(repo_path, exclude=(), messages=None):
+    """Return the unique authors and the kept messages of a repository
+
+    Identities are deduplicated on (name, email) in first-seen order,
+    messages go through the `messages` MessageBuffer (all kept by default).
+    """
+    messages = messages if messages is not None else MessageBuffer()
+    identities = {}
+    for _sha, name, email, message in iter_log(repo_path, exclude):
+        key = (name or UNKNOWN_NAME, email or UNKNOWN_EMAIL)
+        if key not in identities:
+            identities[key] = Identity(*key)
+        messages.add(message)
+    return list(identities.values()), messages.values()
@@ -0,0 +1,84 @@
+import json
+
+from gitsint.utils.commits import UNKNOWN_EMAIL, UNKNOWN_NAME, Identity, MessageBuffer
+from gitsint.utils.pagination import DEFAULT_PAGE_WORKERS, fetch_pages, last_page
+from gitsint.utils.tokens import auth_headers
+
+COMMITS_PER_PAGE = 100
+# Commits read per repository in API mode when --max-commits is not given
+DEFAULT_MAX_COMMITS = 1000
+
+
+def api_headers(args):
+    headers = {"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"}
+    headers.update(auth_headers(args))
+    return headers
+
+
+async def collect_commits_api(repo, client, args, messages=None):
+    """Read commit authors and messages through the API, without cloning
+
+    Pages of /repos/{owner}/{repo}/commits (default branch) are fetched
+    concurrently, window by window, up to --max-commits. The walk stops
+    early when a whole window brings no new identity.
+    Messages go through the `messages` MessageBuffer (all kept by default).
+    Returns the same (response_data, authors) as clone_and_collect_data.
+    """
+    print(f"Processing repo through the API: {repo['name']}")
+    headers = api_headers(args)
+    base_url = (
+        f"https://api.github.com/repos/{repo['full_name']}/commits"
+        f"?per_page={COMMITS_PER_PAGE}"
+    )
+    max_commits = int(args.get("max_commits") or DEFAULT_MAX_COMMITS)
+    max_pages = max(1, -(-max_commits // COMMITS_PER_PAGE))
+    workers = int(args.get("page_workers") or DEFAULT_PAGE_WORKERS)
+
+    identities = {}
+    messages = messages if messages is not None else MessageBuffer()
+
+    def add_page(page):
+        new = 0
+        for item in page[: max_commits - messages.count]:
+            author = (item.get("commit") or {}).get("author") or {}
+            key = (author.get("name") or UNKNOWN_NAME, author.get("email") or UNKNOWN_EMAIL)
+            if key not in identities:
+                identities[key] = Identity(*key)
+                new += 1
+            messages.add(((item.get("commit") or {}).get("message") or "").strip())
+        return new
+
+    response = await client.get(f"{base_url}&page=1", headers=headers)
+    if response.status_code != 200:
+        # 409 for empty repositories, 404 / 403 for missing access
+        print(f"Error reading commits of {repo['full_name']}: {response.status_code}")
+        messages.close()
+        return None, []
+    add_page(response.json())
+
+    pages = min(last_page(response) or 1, max_pages)
+    page = 2
+    while page <= pages and messages.count < max_commits:
+        window = list(range(page, min(page + workers, pages + 1)))
+        urls = [f"{base_url}&page={number}" for number in window]
+        new = 0
+        for response in await fetch_pages(client, urls, headers, workers):
+            if response.status_code == 200:
+                new += add_page(response.json())
+        page = window[-1] + 1
+        if new == 0:
+            break
+
+    messages.close()
+    authors = list(identities.values())
+    print(f"Extracted {len(authors)} authors and {messages.count} messages")
+    response_data = {
+        "name": repo.get("name"),
+        "description": repo.get("description"),
+        "authors": json.dumps([a.as_dict() for a in authors]),
+        "emails": json.dumps([a.email for a in authors]),
+        "messages": json.dumps(messages.values()),
+    }
+    if messages.path is not None:
+        response_data["messages_file"] = str(messages.path)
+    return response_data, authors
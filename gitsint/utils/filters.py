@@ -0,0 +1,97 @@
+from argparse import ArgumentTypeError
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+
+# Default max size in KB of a cloned repository when --size is not given,
+# bigger repositories are read through the API
+DEFAULT_MAX_SIZE = 500000
+
+
+def parse_date(value):
+    """Parse an ISO 8601 date / datetime (GitHub or CLI) as an aware datetime"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def cli_date(value):
+    """argparse type of --pushed-after / --pushed-before: a valid ISO date"""
+    try:
+        parse_date(value)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid ISO date: {value!r} (e.g. 2024-01-31)") from None
+    return value
+
+
+def max_size(args):
+    if "size" in args and args["size"] and int(args["size"]) > 0:
+        return int(args["size"])
+    return DEFAULT_MAX_SIZE
+
+
+def keep_repository(repo, args):
+    """Check one repository against the metadata filters of the CLI"""
+    if "fork" in args and not args["fork"] and repo.get("fork"):
+        return False
+
+    archived = args.get("archived") or "include"
+    if archived == "exclude" and repo.get("archived"):
+        return False
+    if archived == "only" and not repo.get("archived"):
+        return False
+
+    languages = args.get("language")
+    if languages:
+        language = (repo.get("language") or "").lower()
+        if language not in {lang.lower() for lang in languages}:
+            return False
+
+    stars = int(repo.get("stargazers_count") or 0)
+    if args.get("min_stars") is not None and stars < int(args["min_stars"]):
+        return False
+    if args.get("max_stars") is not None and stars > int(args["max_stars"]):
+        return False
+
+    pushed_after = parse_date(args.get("pushed_after"))
+    pushed_before = parse_date(args.get("pushed_before"))
+    if pushed_after or pushed_before:
+        pushed_at = parse_date(repo.get("pushed_at"))
+        if pushed_at is None:
+            return False
+        if pushed_after and pushed_at < pushed_after:
+            return False
+        if pushed_before and pushed_at > pushed_before:
+            return False
+
+    name = repo.get("name", "")
+    includes = args.get("include")
+    if includes and not any(fnmatch(name, pattern) for pattern in includes):
+        return False
+    excludes = args.get("exclude")
+    if excludes and any(fnmatch(name, pattern) for pattern in excludes):
+        return False
+
+    return True
+
+
+def filter_repositories(repos, args):
+    """Select the repositories worth cloning, before any clone starts
+
+    Empty repositories, forks, archived state, language, stars, push date
+    and name globs are checked on the metadata returned by the API, then
+    --top keeps the most recently pushed repositories.
+    """
+    repos = [
+        repo
+        for repo in repos
+        if int(repo.get("size") or 0) > 0 and keep_repository(repo, args)
+    ]
+
+    top = int(args.get("top") or 0)
+    if top > 0:
+        repos = sorted(repos, key=lambda repo: repo.get("pushed_at") or "", reverse=True)
+        repos = repos[:top]
+    return repos
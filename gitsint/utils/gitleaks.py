@@ -3,13 +3,18 @@ import os
 import platform
 import subprocess
 import tarfile
+import time
 import zipfile
 from io import BytesIO
-import requests
+
+import trio
 
 GITLEAKS_VERSION = "8.25.1"
 GITLEAKS_DIR = os.path.join(os.path.dirname(__file__), "../tools/gitleaks")
 GITLEAKS_BIN = os.path.join(GITLEAKS_DIR, "gitleaks")
+# Number of gitleaks processes running at the same time
+DEFAULT_GITLEAKS_WORKERS = 2
+CHUNK_SIZE = 1 << 16
 
 
 def setup_gitleaks():
@@ -36,6 +41,8 @@ def setup_gitleaks():
     filename = f"gitleaks_{GITLEAKS_VERSION}_{system}_{arch}.{ext}"
     url = f"https://github.com/gitleaks/gitleaks/releases/download/v{GITLEAKS_VERSION}/{filename}"
 
+    import requests
+
     resp = requests.get(url)
     if resp.status_code != 200:
         raise Exception(f"Failed to download Gitleaks: {url}")
@@ -94,3 +101,87 @@ def run_gitleaks_scan(repo_path):
     except Exception as e:
         print(f"❌ Exception while running Gitleaks on {repo_path}: {e}")
         return []
+
+
+def iter_report(report_path):
+    """Yield the findings of a gitleaks JSON report one at a time
+
+    The report (a JSON array) is decoded chunk by chunk so large reports
+    are never held in memory as a whole.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    with open(report_path, "r", encoding="utf8") as report:
+        while True:
+            chunk = report.read(CHUNK_SIZE)
+            buffer += chunk
+            while True:
+                buffer = buffer.lstrip(" \t\r\n[,")
+                if not buffer or buffer.startswith("]"):
+                    break
+                try:
+                    finding, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    # Incomplete object: wait for the next chunk
+                    break
+                buffer = buffer[end:]
+                yield finding
+            if not chunk:
+                return
+
+
+def summarize_finding(finding):
+    """Keep the fields gitsint reports from a gitleaks finding"""
+    return {
+        "rule": finding.get("RuleID", "unknown"),
+        "file": finding.get("File", "unknown"),
+        "line": finding.get("StartLine", "?"),
+        "commit": finding.get("Commit", ""),
+        "author": finding.get("Author", ""),
+        "email": finding.get("Email", ""),
+        "secret": finding.get("Secret", ""),
+    }
+
+
+async def run_gitleaks_scan_async(repo_path, report_path, limiter=None, profiler=None):
+    """Scan a clone with a gitleaks subprocess without blocking the event loop
+
+    The report is written to `report_path` and parsed incrementally.
+    At most `limiter` scans run at the same time, the time spent scanning
+    is reported to `profiler` if given.
+    """
+    bin_path = await trio.to_thread.run_sync(setup_gitleaks)
+    limiter = limiter or trio.CapacityLimiter(DEFAULT_GITLEAKS_WORKERS)
+    command = [
+        bin_path,
+        "detect",
+        "--source",
+        str(repo_path),
+        "--no-banner",
+        "--report-format",
+        "json",
+        "--report-path",
+        str(report_path),
+    ]
+    try:
+        async with limiter:
+            start = time.perf_counter()
+            result = await trio.run_process(
+                command, check=False, capture_stdout=True, capture_stderr=True
+            )
+            if profiler is not None:
+                profiler.record("phases", "gitleaks", time.perf_counter() - start)
+    except Exception as e:
+        print(f"❌ Exception while running Gitleaks on {repo_path}: {e}")
+        return []
+
+    if result.returncode not in (0, 1):
+        stderr = result.stderr.decode("utf8", errors="replace").strip()
+        print(f"❌ Gitleaks error on {repo_path}:\n{stderr}")
+        return []
+
+    try:
+        return [summarize_finding(finding) for finding in iter_report(report_path)]
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ Gitleaks returned an invalid report for {repo_path}: {e}")
+        return []
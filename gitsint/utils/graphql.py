@@ -0,0 +1,185 @@
+import trio
+
+from gitsint.utils.tokens import auth_headers
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+PAGE_SIZE = 100
+
+REPOSITORY_FIELDS = """
+        pageInfo { hasNextPage endCursor }
+        nodes {
+          name nameWithOwner description url isFork isArchived isPrivate
+          diskUsage stargazerCount pushedAt primaryLanguage { name }
+        }"""
+
+USER_FIELDS = """
+        pageInfo { hasNextPage endCursor }
+        nodes { login name url }"""
+
+QUERY = """
+query(%(login)s$repos: String, $followers: String, $following: String,
+      $withRepos: Boolean!, $withFollowers: Boolean!, $withFollowing: Boolean!) {
+  owner: %(root)s {
+    login
+    repositories(first: %(size)d, after: $repos, ownerAffiliations: %(affiliations)s)
+        @include(if: $withRepos) {%(repos)s
+    }
+    followers(first: %(size)d, after: $followers) @include(if: $withFollowers) {%(users)s
+    }
+    following(first: %(size)d, after: $following) @include(if: $withFollowing) {%(users)s
+    }
+  }
+}
+"""
+
+# Connection name -> query variable holding its cursor
+CONNECTIONS = {"repositories": "repos", "followers": "followers", "following": "following"}
+
+# In-flight and finished collections, shared by the modules of a scan
+_collections = {}
+
+
+class GraphQLError(Exception):
+    """The GraphQL API answered with errors or without data"""
+
+
+def use_graphql(args):
+    """The collector is used with --graphql and when a token is available"""
+    return bool(args.get("graphql")) and bool(args.get("token"))
+
+
+def build_query(private=False):
+    return QUERY % {
+        "login": "" if private else "$login: String!, ",
+        "root": "viewer" if private else "user(login: $login)",
+        # Same repositories as REST /user/repos and /users/{login}/repos
+        "affiliations": "[OWNER, COLLABORATOR, ORGANIZATION_MEMBER]" if private else "OWNER",
+        "size": PAGE_SIZE,
+        "repos": REPOSITORY_FIELDS,
+        "users": USER_FIELDS,
+    }
+
+
+def to_repository(node):
+    """Map a Repository node to the fields of a REST repository object"""
+    language = node.get("primaryLanguage") or {}
+    return {
+        "name": node["name"],
+        "full_name": node["nameWithOwner"],
+        "description": node.get("description"),
+        "html_url": node["url"],
+        "clone_url": node["url"] + ".git",
+        "fork": node.get("isFork", False),
+        "archived": node.get("isArchived", False),
+        "private": node.get("isPrivate", False),
+        "size": node.get("diskUsage") or 0,
+        "stargazers_count": node.get("stargazerCount", 0),
+        "pushed_at": node.get("pushedAt"),
+        "language": language.get("name"),
+    }
+
+
+def to_friend(node):
+    """Map a User node to the records scraped by the friends module"""
+    return {"name": node.get("name"), "username": node["login"], "link": node["url"]}
+
+
+async def query(client, args, variables, private=False):
+    headers = auth_headers(args)
+    response = await client.post(
+        GRAPHQL_URL,
+        json={"query": build_query(private), "variables": variables},
+        headers=headers,
+    )
+    try:
+        payload = response.json()
+    except ValueError as e:
+        raise GraphQLError(f"Invalid GraphQL response ({response.status_code})") from e
+    if payload.get("errors") or not (payload.get("data") or {}).get("owner"):
+        errors = payload.get("errors") or [{"message": payload.get("message", "No data")}]
+        raise GraphQLError("; ".join(error.get("message", "") for error in errors))
+    return payload["data"]["owner"]
+
+
+async def fetch_all(login, client, args, connections=tuple(CONNECTIONS)):
+    """Page through the given connections of a user in batched queries
+
+    Every query advances all the requested connections that still have
+    pages, the others are left out of the query.
+    """
+    private = bool(args.get("private"))
+    results = {connection: [] for connection in connections}
+    cursors = {variable: None for variable in CONNECTIONS.values()}
+    pending = set(connections)
+
+    while pending:
+        variables = dict(cursors)
+        if not private:
+            variables["login"] = login
+        for connection, variable in CONNECTIONS.items():
+            flag = "with" + variable[0].upper() + variable[1:]
+            variables[flag] = connection in pending
+        owner = await query(client, args, variables, private)
+
+        for connection in list(pending):
+            page = owner[connection]
+            results[connection].extend(page["nodes"])
+            if page["pageInfo"]["hasNextPage"]:
+                cursors[CONNECTIONS[connection]] = page["pageInfo"]["endCursor"]
+            else:
+                pending.discard(connection)
+
+    return {
+        connection: [
+            (to_repository if connection == "repositories" else to_friend)(node)
+            for node in nodes
+        ]
+        for connection, nodes in results.items()
+    }
+
+
+async def collect(login, client, args, connections=tuple(CONNECTIONS)):
+    """Collect some connections of a user once per scan
+
+    Each connection is collected on its own: a module only waits for the
+    connections it asked for. Concurrent callers for the same connection
+    wait for the same collection. Returns {connection: items}, raises
+    GraphQLError when a collection failed.
+    """
+    private = bool(args.get("private"))
+    missing = [c for c in connections if (login, private, c) not in _collections]
+    if missing:
+        entries = {}
+        for connection in missing:
+            entries[connection] = _collections[(login, private, connection)] = {
+                "done": trio.Event(),
+                "result": None,
+                "error": None,
+            }
+        try:
+            results = await fetch_all(login, client, args, missing)
+            for connection, entry in entries.items():
+                entry["result"] = results[connection]
+        except Exception as e:
+            for entry in entries.values():
+                entry["error"] = GraphQLError(str(e))
+        finally:
+            for entry in entries.values():
+                if entry["result"] is None and entry["error"] is None:
+                    entry["error"] = GraphQLError("Collection cancelled")
+                entry["done"].set()
+
+    result = {}
+    for connection in connections:
+        entry = _collections[(login, private, connection)]
+        await entry["done"].wait()
+        if entry["error"] is not None:
+            raise entry["error"]
+        result[connection] = entry["result"]
+    return result
+
+
+def forget(login):
+    """Drop the collections of a login once its scan is finished"""
+    for key in [key for key in _collections if key[0] == login]:
+        del _collections[key]
@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+
+
+class Journal:
+    """Append-only NDJSON log of the work done by a scan, to resume it
+
+    Every line is flushed as soon as it is written, so a scan killed at
+    any point (OOM, eviction, Ctrl-C) loses at most the line being
+    written. Entries:
+
+    - scan: the command line and the usernames of the scan
+    - start: a module started on a username, its previous records are void
+    - record: one record produced by a module
+    - module: a module finished on a username
+    - repo: a repository processed by the repository module, with its authors
+    - page: the users scraped from one followers / following page
+    - user: every module finished on a username and its results were exported
+
+    Reopening a journal replays it: finished usernames are skipped,
+    finished modules return their records without running, the
+    repository module skips the repositories it already processed and
+    friends reuses the pages it already fetched.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.argv = None
+        self.usernames = None
+        self.users_done = set()
+        self.modules_done = set()
+        # (username, module) -> records since the last start of the module
+        self.records = {}
+        # (username, full_name) -> repo entry
+        self.repos = {}
+        # (username, url) -> users
+        self.pages = {}
+        torn = False
+        if os.path.exists(path):
+            self.load()
+            with open(path, "rb") as journal_file:
+                journal_file.seek(0, os.SEEK_END)
+                if journal_file.tell():
+                    journal_file.seek(-1, os.SEEK_END)
+                    torn = journal_file.read(1) != b"\n"
+        self.stream = open(path, "a", encoding="utf8")
+        if torn:
+            # End the line cut by a crash, it must not swallow the next one
+            self.write_line("")
+
+    def load(self):
+        with open(self.path, "r", encoding="utf8") as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A line cut by a crash, the work it records is redone
+                    continue
+                self.replay(entry)
+
+    def replay(self, entry):
+        kind = entry.get("type")
+        username = entry.get("username")
+        if kind == "scan":
+            self.argv = entry["argv"]
+            self.usernames = entry["usernames"]
+        elif kind == "start":
+            key = (username, entry["module"])
+            self.modules_done.discard(key)
+            self.records[key] = []
+        elif kind == "record":
+            self.records.setdefault((username, entry["module"]), []).append(entry["record"])
+        elif kind == "module":
+            self.modules_done.add((username, entry["module"]))
+        elif kind == "repo":
+            self.repos[(username, entry["full_name"])] = entry
+        elif kind == "page":
+            self.pages[(username, entry["url"])] = entry["users"]
+        elif kind == "user":
+            self.forget(entry.get("login") or username)
+            self.users_done.add(username)
+
+    def forget(self, username):
+        """Drop what is only needed while `username` is being scanned"""
+        for table in (self.records, self.repos, self.pages):
+            for key in [key for key in table if key[0] == username]:
+                del table[key]
+        self.modules_done = {key for key in self.modules_done if key[0] != username}
+
+    def write(self, entry, sync=False):
+        self.write_line(json.dumps(entry), sync)
+
+    def write_line(self, line, sync=False):
+        with self.lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+            if sync:
+                os.fsync(self.stream.fileno())
+
+    def close(self):
+        with self.lock:
+            self.stream.close()
+
+    # Writers
+
+    def scan(self, argv, usernames):
+        self.argv = argv
+        self.usernames = usernames
+        self.write({"type": "scan", "argv": argv, "usernames": usernames}, sync=True)
+
+    def module_started(self, username, module):
+        self.records.pop((username, module), None)
+        self.write({"type": "start", "username": username, "module": module})
+
+    def record(self, username, module, record):
+        self.write({"type": "record", "username": username, "module": module, "record": record})
+
+    def module_done(self, username, module):
+        self.modules_done.add((username, module))
+        self.write({"type": "module", "username": username, "module": module})
+
+    def repo_done(self, username, full_name, record, authors, cloned=False):
+        """`authors` are Identity objects, replayed as their dicts"""
+        self.write(
+            {
+                "type": "repo",
+                "username": username,
+                "full_name": full_name,
+                "record": record,
+                "authors": [author.as_dict() for author in authors],
+                "cloned": cloned,
+            }
+        )
+
+    def page_done(self, username, url, users):
+        self.write({"type": "page", "username": username, "url": url, "users": users})
+
+    def user_done(self, username, login=None):
+        """`username` as given to the scan, `login` as returned by GitHub"""
+        self.forget(login or username)
+        self.users_done.add(username)
+        self.write({"type": "user", "username": username, "login": login}, sync=True)
+
+    # Readers
+
+    def is_user_done(self, username):
+        return username in self.users_done
+
+    def module_records(self, username, module):
+        """Records of a finished module, None if it has to run"""
+        if (username, module) not in self.modules_done:
+            return None
+        return self.records.get((username, module), [])
+
+    def repo(self, username, full_name):
+        return self.repos.get((username, full_name))
+
+    def page(self, username, url):
+        return self.pages.get((username, url))
@@ -0,0 +1,68 @@
+import json
+import sys
+
+
+class NDJSONSink:
+    """Write every module result as one JSON line, flushed immediately
+
+    Nothing is kept in memory once a line is written, whatever the number
+    of targets or repositories.
+    """
+
+    def __init__(self, path="-"):
+        if path == "-":
+            self.stream = sys.stdout
+            self.owned = False
+        else:
+            self.stream = open(path, "a", encoding="utf8")
+            self.owned = True
+
+    def write(self, username, records):
+        for record in records:
+            line = {"username": username, "module_name": record["name"], "data": record}
+            self.stream.write(json.dumps(line) + "\n")
+        self.stream.flush()
+
+    def close(self):
+        if self.owned:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+class RecordStream:
+    """Module output handing every record over as soon as it is appended
+
+    Records go to the NDJSON `sink`, if any, then to `out` unless it is
+    None, so a module producing one record per repository never holds
+    them all at once. `partial` and `failed` tell if a record was marked
+    partial or as an error.
+    Records are also logged in the --journal of the scan, if any, under
+    the name of the `module` producing them.
+    """
+
+    def __init__(self, username, sink=None, out=None, journal=None, module=None):
+        self.username = username
+        self.sink = sink
+        self.out = out
+        self.journal = journal
+        self.module = module
+        self.partial = False
+        self.failed = False
+
+    def append(self, record):
+        if self.sink is not None:
+            self.sink.write(self.username, [record])
+        self.replay(record)
+
+    def replay(self, record):
+        """Keep a record streamed by a previous run of the scan, without
+        streaming it again"""
+        if record.get("partial"):
+            self.partial = True
+        if record.get("error"):
+            self.failed = True
+        if self.journal is not None:
+            self.journal.record(self.username, self.module, record)
+        if self.out is not None:
+            self.out.append(record)
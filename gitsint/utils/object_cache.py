@@ -0,0 +1,105 @@
+import threading
+from pathlib import Path
+
+from git import Repo
+
+from gitsint.utils.commits_api import api_headers
+
+# One lock per fork network: git does not like concurrent fetches
+# into the same repository
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def _lock(network):
+    with _locks_lock:
+        return _locks.setdefault(network, threading.Lock())
+
+
+def network_path(cache_dir, network, partial=False):
+    """Bare repository shared by every fork of the `network` root repository
+
+    Blobless stores (--clone-mode partial) are kept apart: a full clone
+    borrowing from one would miss the blobs it never fetched.
+    """
+    owner, _, name = network.lower().partition("/")
+    return Path(cache_dir) / owner / (f"{name}.blobless.git" if partial else f"{name}.git")
+
+
+def ref_namespace(full_name):
+    """Refs of one member of a network, so forks never overwrite each other"""
+    return f"refs/gitsint/{full_name.lower()}"
+
+
+async def resolve_network(repo, client, args):
+    """full_name of the root of the fork network of a repository
+
+    Forks listed by /users/{user}/repos do not say what they were forked
+    from, the repository itself is fetched to read its "source".
+    """
+    if not repo.get("fork"):
+        return repo["full_name"]
+    if repo.get("source"):
+        return repo["source"]["full_name"]
+    response = await client.get(
+        f"https://api.github.com/repos/{repo['full_name']}", headers=api_headers(args)
+    )
+    if response.status_code != 200:
+        return repo["full_name"]
+    source = response.json().get("source") or {}
+    return source.get("full_name") or repo["full_name"]
+
+
+def _keep_objects(store):
+    """Never let git drop objects of the store, see update()"""
+    with store.config_reader("repository") as config:
+        if config.has_option("gc", "auto") and config.get_value("gc", "auto") == 0:
+            return
+    with store.config_writer() as config:
+        config.set_value("gc", "auto", 0)
+        config.set_value("gc", "pruneExpire", "never")
+
+
+def update(cache_dir, network, full_name, clone_url, env=None, partial=False):
+    """Fetch the objects of one network member missing from the shared store
+
+    Returns the path of the bare repository, to give to `git clone
+    --reference` so the clone only transfers objects the store lacks.
+    An incremental commit-graph is kept in the store: clones borrowing
+    from it list their shared history without parsing every commit.
+    A `partial` store only fetches commits and trees (--filter=blob:none),
+    each member is a promisor remote of it for the blobs it lacks.
+
+    Refs of deleted or force-pushed branches are pruned, but their objects
+    are never: clones under results/ may still borrow them through their
+    alternates, so auto-gc is off in the store (gc.auto=0) and a manual gc
+    keeps unreachable objects (gc.pruneExpire=never).
+    """
+    path = network_path(cache_dir, network, partial)
+    namespace = ref_namespace(full_name)
+    with _lock(network):
+        if path.exists():
+            store = Repo(path)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            store = Repo.init(path, bare=True)
+        _keep_objects(store)
+        source = clone_url
+        options = []
+        if partial:
+            source = full_name.lower()
+            store.git.config(f"remote.{source}.url", clone_url)
+            store.git.config(f"remote.{source}.promisor", "true")
+            store.git.config(f"remote.{source}.partialclonefilter", "blob:none")
+            options.append("--filter=blob:none")
+        with store.git.custom_environment(**(env or {})):
+            store.git.fetch(
+                "--no-tags",
+                "--prune",
+                *options,
+                source,
+                f"+refs/heads/*:{namespace}/heads/*",
+                f"+refs/tags/*:{namespace}/tags/*",
+            )
+        store.git.commit_graph("write", "--reachable", "--split")
+    return path
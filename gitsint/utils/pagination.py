@@ -0,0 +1,46 @@
+import math
+from urllib.parse import parse_qs, urlparse
+
+import trio
+
+# Number of pages requested at the same time for a single listing
+DEFAULT_PAGE_WORKERS = 8
+
+
+def last_page(response):
+    """Return the last page number advertised by the Link header, if any"""
+    last = response.links.get("last", {}).get("url")
+    if not last:
+        return None
+    try:
+        return int(parse_qs(urlparse(last).query)["page"][0])
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+def page_count(total, per_page):
+    """Number of pages needed to list `total` items, None when unknown"""
+    if total is None:
+        return None
+    try:
+        return max(1, math.ceil(int(total) / per_page))
+    except (TypeError, ValueError):
+        return None
+
+
+async def fetch_pages(client, urls, headers=None, workers=DEFAULT_PAGE_WORKERS):
+    """Fetch every url concurrently and return the responses in the same order
+
+    At most `workers` requests are in flight at the same time.
+    """
+    responses = [None] * len(urls)
+    limiter = trio.CapacityLimiter(max(1, workers))
+
+    async def fetch(index, url):
+        async with limiter:
+            responses[index] = await client.get(url, headers=headers)
+
+    async with trio.open_nursery() as nursery:
+        for index, url in enumerate(urls):
+            nursery.start_soon(fetch, index, url)
+    return responses
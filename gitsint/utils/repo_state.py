@@ -0,0 +1,99 @@
+import json
+import os
+import subprocess
+from pathlib import Path
+
+from gitsint.utils.commits import Identity
+
+STATE_VERSION = 1
+
+
+def state_path(repo_path):
+    """State file kept next to a cloned repository"""
+    repo_path = Path(repo_path)
+    return repo_path.parent / f".{repo_path.name}.gitsint.json"
+
+
+def load_state(repo_path):
+    """Return the persisted state of a clone, or None if missing / unreadable"""
+    path = state_path(repo_path)
+    try:
+        with open(path, "r", encoding="utf8") as state_file:
+            state = json.load(state_file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+        return None
+    state["authors"] = [Identity.from_dict(author) for author in state.get("authors", [])]
+    return state
+
+
+def save_state(repo_path, refs, authors, messages, messages_mode="all", message_count=None):
+    """Atomically write the processed refs and the cached commit results
+
+    `authors` are Identity objects. `messages_mode` is the --messages mode
+    the cached messages were kept with, spilled messages live in their own
+    file and are not cached here: `message_count` counts them all.
+    """
+    path = state_path(repo_path)
+    tmp_path = path.with_suffix(".tmp")
+    state = {
+        "version": STATE_VERSION,
+        "refs": refs,
+        "authors": [author.as_dict() for author in authors],
+        "messages": messages,
+        "messages_mode": messages_mode,
+        "message_count": len(messages) if message_count is None else message_count,
+    }
+    with open(tmp_path, "w", encoding="utf8") as state_file:
+        json.dump(state, state_file)
+    os.replace(tmp_path, path)
+
+
+def current_refs(repo_obj):
+    """Map every ref of the repository to the SHA it points to"""
+    refs = {}
+    output = repo_obj.git.for_each_ref("--format=%(objectname) %(refname)")
+    for line in output.splitlines():
+        sha, _, ref = line.partition(" ")
+        if ref:
+            refs[ref] = sha
+    return refs
+
+
+def existing_commits(repo_path, shas):
+    """Keep the SHAs that are still present in the repository object store"""
+    shas = sorted(set(shas))
+    if not shas:
+        return []
+    process = subprocess.run(
+        ["git", "-C", str(repo_path), "cat-file", "--batch-check"],
+        input="\n".join(shas) + "\n",
+        capture_output=True,
+        text=True,
+    )
+    return [
+        line.split(" ")[0]
+        for line in process.stdout.splitlines()
+        if line and not line.endswith(" missing")
+    ]
+
+
+def refresh(repo_obj, env=None):
+    """`git fetch` the origin of an existing clone
+
+    Bare clones have no fetch refspec, so their branches and tags are
+    updated explicitly. Full, partial and mirror clones use their own.
+    """
+    with repo_obj.git.custom_environment(**(env or {})):
+        try:
+            repo_obj.git.config("--get-all", "remote.origin.fetch")
+        except Exception:
+            repo_obj.git.fetch(
+                "--prune",
+                "origin",
+                "+refs/heads/*:refs/heads/*",
+                "+refs/tags/*:refs/tags/*",
+            )
+        else:
+            repo_obj.git.fetch("--prune", "--tags", "origin")
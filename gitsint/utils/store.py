@@ -0,0 +1,173 @@
+import json
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    login TEXT NOT NULL UNIQUE,
+    name TEXT,
+    email TEXT,
+    company TEXT,
+    location TEXT,
+    profile TEXT,
+    scanned_at REAL
+);
+CREATE TABLE IF NOT EXISTS repos (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    name TEXT NOT NULL,
+    description TEXT,
+    UNIQUE (user_id, name)
+);
+CREATE TABLE IF NOT EXISTS emails (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email_id INTEGER NOT NULL REFERENCES emails(id),
+    UNIQUE (name, email_id)
+);
+CREATE TABLE IF NOT EXISTS repo_authors (
+    repo_id INTEGER NOT NULL REFERENCES repos(id),
+    author_id INTEGER NOT NULL REFERENCES authors(id),
+    PRIMARY KEY (repo_id, author_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_repos_user ON repos(user_id);
+CREATE INDEX IF NOT EXISTS idx_authors_email ON authors(email_id);
+CREATE INDEX IF NOT EXISTS idx_authors_name ON authors(name);
+CREATE INDEX IF NOT EXISTS idx_repo_authors_author ON repo_authors(author_id);
+"""
+
+USERS_BY_EMAIL = """
+SELECT DISTINCT users.login, repos.name, authors.name
+FROM emails
+JOIN authors ON authors.email_id = emails.id
+JOIN repo_authors ON repo_authors.author_id = authors.id
+JOIN repos ON repos.id = repo_authors.repo_id
+JOIN users ON users.id = repos.user_id
+WHERE emails.email = ?
+ORDER BY users.login, repos.name
+"""
+
+
+def parse_repositories(records):
+    """Extract (repo name, description, authors) from repository records"""
+    repositories = []
+    for record in records:
+        if record.get("name") != "repository" or not record.get("data"):
+            continue
+        data = record["data"]
+        if isinstance(data, str):
+            data = json.loads(data)
+        for entry in data if isinstance(data, list) else [data]:
+            # The aggregated author list has no "authors" key, skip it
+            if not isinstance(entry, dict) or "authors" not in entry:
+                continue
+            authors = entry["authors"]
+            if isinstance(authors, str):
+                authors = json.loads(authors)
+            repositories.append((entry.get("name"), entry.get("description"), authors))
+    return repositories
+
+
+class Store:
+    """SQLite store of scanned users, repositories, commit authors and emails
+
+    Every scan is written in a single transaction with batched inserts,
+    the database runs in WAL mode so it can be queried while scans write.
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def save_scan(self, username, records, user=None):
+        """Store the records produced for one username"""
+        profile = user if isinstance(user, dict) else {}
+        for record in records:
+            if record.get("name") == "aprofile" and isinstance(record.get("data"), dict):
+                profile = record["data"]
+        repositories = parse_repositories(records)
+
+        with self.conn:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                """
+                INSERT INTO users (login, name, email, company, location, profile, scanned_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(login) DO UPDATE SET
+                    name = excluded.name, email = excluded.email,
+                    company = excluded.company, location = excluded.location,
+                    profile = excluded.profile, scanned_at = excluded.scanned_at
+                """,
+                (
+                    username,
+                    profile.get("name"),
+                    profile.get("email"),
+                    profile.get("company"),
+                    profile.get("location"),
+                    json.dumps(profile),
+                    time.time(),
+                ),
+            )
+            user_id = cursor.execute(
+                "SELECT id FROM users WHERE login = ?", (username,)
+            ).fetchone()[0]
+            if not repositories:
+                return
+
+            cursor.executemany(
+                """
+                INSERT INTO repos (user_id, name, description) VALUES (?, ?, ?)
+                ON CONFLICT(user_id, name) DO UPDATE SET description = excluded.description
+                """,
+                [(user_id, name, description) for name, description, _ in repositories],
+            )
+            identities = {
+                (author.get("name") or "Unknown", author.get("email") or "unknown@example.com")
+                for _, _, authors in repositories
+                for author in authors
+            }
+            cursor.executemany(
+                "INSERT OR IGNORE INTO emails (email) VALUES (?)",
+                [(email,) for email in {email for _, email in identities}],
+            )
+            cursor.executemany(
+                """
+                INSERT OR IGNORE INTO authors (name, email_id)
+                SELECT ?, id FROM emails WHERE email = ?
+                """,
+                list(identities),
+            )
+            cursor.executemany(
+                """
+                INSERT OR IGNORE INTO repo_authors (repo_id, author_id)
+                SELECT repos.id, authors.id
+                FROM repos, authors JOIN emails ON emails.id = authors.email_id
+                WHERE repos.user_id = ? AND repos.name = ?
+                  AND authors.name = ? AND emails.email = ?
+                """,
+                [
+                    (
+                        user_id,
+                        name,
+                        author.get("name") or "Unknown",
+                        author.get("email") or "unknown@example.com",
+                    )
+                    for name, _, authors in repositories
+                    for author in authors
+                ],
+            )
+
+    def users_by_email(self, email):
+        """Scanned users having `email` as a commit author, with where it appears"""
+        return self.conn.execute(USERS_BY_EMAIL, (email,)).fetchall()
@@ -0,0 +1,178 @@
+import time
+
+import httpx
+import trio
+
+# Budget assumed for a token before GitHub reported its real one
+DEFAULT_LIMIT = 5000
+# Attempts of a single request when tokens keep getting rate limited
+MAX_ATTEMPTS = 5
+
+
+def is_identity_scoped(url):
+    """/user and /user/...: answered for the account owning the token"""
+    return url.path == "/user" or url.path.startswith("/user/")
+
+
+def auth_headers(args):
+    """Authorization header of the API requests sent by gitsint
+
+    Empty when a TokenPoolTransport authenticates the requests: it only
+    sets the header of requests that do not carry one already.
+    """
+    if args.get("token_pool") is not None:
+        return {}
+    token = args.get("token")
+    if isinstance(token, (list, tuple)):
+        token = token[0] if token else None
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+
+def resource_of(url):
+    """Rate limit bucket of a GitHub API url"""
+    if url.path.startswith("/graphql"):
+        return "graphql"
+    if url.path.startswith("/search"):
+        return "search"
+    return "core"
+
+
+class TokenState:
+    def __init__(self, token):
+        self.token = token
+        self.valid = True
+        # resource -> [remaining, reset timestamp]
+        self.limits = {}
+
+    def remaining(self, resource, now):
+        remaining, reset = self.limits.get(resource, (DEFAULT_LIMIT, 0))
+        if reset and reset <= now:
+            return DEFAULT_LIMIT
+        return remaining
+
+    def reset(self, resource):
+        return self.limits.get(resource, (DEFAULT_LIMIT, 0))[1]
+
+
+class TokenPool:
+    """Route requests to the token with the most remaining rate limit budget"""
+
+    def __init__(self, tokens, profiler=None):
+        self.states = [TokenState(token) for token in dict.fromkeys(tokens) if token]
+        self.profiler = profiler
+
+    def __len__(self):
+        return len(self.states)
+
+    async def acquire(self, resource, pinned=False):
+        """Return the best token, sleeping until a reset if all are exhausted
+
+        A `pinned` request always gets the first valid token, so that
+        requests answered for the account of the token see the same one.
+        Returns None once every token has been rejected as invalid.
+        """
+        while True:
+            now = time.time()
+            valid = [state for state in self.states if state.valid]
+            if not valid:
+                return None
+            if pinned:
+                valid = valid[:1]
+            best = max(valid, key=lambda state: state.remaining(resource, now))
+            remaining = best.remaining(resource, now)
+            if remaining > 0:
+                # Reserve one call so concurrent requests spread over tokens
+                best.limits[resource] = [remaining - 1, best.reset(resource)]
+                return best
+            wait = max(1, min(state.reset(resource) for state in valid) - now + 1)
+            print(f"All tokens are rate limited, waiting {round(wait)}s for a reset")
+            started = time.perf_counter()
+            await trio.sleep(wait)
+            if self.profiler is not None:
+                self.profiler.record("rate_limit", resource, time.perf_counter() - started)
+
+    def update(self, state, resource, response):
+        """Record the budget GitHub reports for a token"""
+        if response.status_code == 401:
+            state.valid = False
+            return
+        headers = response.headers
+        if "x-ratelimit-remaining" not in headers:
+            return
+        try:
+            remaining = int(headers["x-ratelimit-remaining"])
+            reset = int(headers.get("x-ratelimit-reset", 0))
+        except ValueError:
+            return
+        resource = headers.get("x-ratelimit-resource", resource)
+        state.limits[resource] = [remaining, reset]
+
+
+def is_rate_limited(response):
+    return (
+        response.status_code in (403, 429)
+        and response.headers.get("x-ratelimit-remaining") == "0"
+    )
+
+
+class TokenPoolTransport(httpx.AsyncBaseTransport):
+    """Authenticate GitHub API requests with the least used token of a pool
+
+    Requests rejected because their token ran out of budget, or because it
+    is invalid, are retried with another token. When every token is
+    exhausted the request waits for the earliest reset. Requests already
+    carrying an Authorization header are left alone, /user endpoints
+    always use the same token.
+    """
+
+    def __init__(self, transport, pool, host="api.github.com"):
+        self.transport = transport
+        self.pool = pool
+        self.host = host
+
+    async def handle_async_request(self, request):
+        if (
+            request.url.host != self.host
+            or not len(self.pool)
+            or "authorization" in request.headers
+        ):
+            return await self.transport.handle_async_request(request)
+
+        resource = resource_of(request.url)
+        pinned = is_identity_scoped(request.url)
+        response = None
+        for _ in range(MAX_ATTEMPTS):
+            state = await self.pool.acquire(resource, pinned)
+            if state is None:
+                break
+            request.headers["Authorization"] = f"Bearer {state.token}"
+            if response is not None:
+                await response.aclose()
+            response = await self.transport.handle_async_request(request)
+            self.pool.update(state, resource, response)
+            if response.status_code != 401 and not is_rate_limited(response):
+                return response
+
+        if response is None:
+            # No usable token left: let GitHub answer anonymously
+            request.headers.pop("Authorization", None)
+            response = await self.transport.handle_async_request(request)
+        return response
+
+    def credential(self, request):
+        """Authorization `request` is sent with, as far as it is known
+
+        Pooled requests may use any token of the pool, /user endpoints
+        the first valid one. Empty for anonymous requests.
+        """
+        if "authorization" in request.headers:
+            return request.headers["authorization"]
+        valid = [state.token for state in self.pool.states if state.valid]
+        if request.url.host != self.host or not valid:
+            return ""
+        if is_identity_scoped(request.url):
+            return f"Bearer {valid[0]}"
+        return "pool\n" + "\n".join(valid)
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,77 @@
+import unittest
+
+import httpx
+import trio
+
+from gitsint.utils.adaptive import AdaptiveLimiter, AdaptiveTransport
+
+
+def run(transport, method="GET"):
+    async def main():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.request(method, "https://api.github.com/users/exemple")
+
+    return trio.run(main)
+
+
+class TestAdaptiveTransport(unittest.TestCase):
+    def test_retry_after(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            return httpx.Response(200, json={"login": "exemple"})
+
+        transport = AdaptiveTransport(httpx.MockTransport(handler), initial=8)
+        response = run(transport)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(transport.hosts["api.github.com"].limit, 4)
+
+    def test_secondary_rate_limit_gives_up(self):
+        def handler(request):
+            return httpx.Response(
+                403, json={"message": "You have exceeded a secondary rate limit."}
+            )
+
+        transport = AdaptiveTransport(httpx.MockTransport(handler), retries=2, backoff=0)
+        self.assertEqual(run(transport).status_code, 403)
+
+    def test_primary_rate_limit_is_not_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(403, headers={"x-ratelimit-remaining": "0"})
+
+        transport = AdaptiveTransport(httpx.MockTransport(handler), backoff=0)
+        self.assertEqual(run(transport).status_code, 403)
+        self.assertEqual(len(calls), 1)
+
+    def test_post_is_not_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        transport = AdaptiveTransport(httpx.MockTransport(handler), backoff=0)
+        self.assertEqual(run(transport, "POST").status_code, 503)
+        self.assertEqual(len(calls), 1)
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def test_additive_increase(self):
+        async def main():
+            limiter = AdaptiveLimiter(initial=2, maximum=3)
+            for _ in range(10):
+                limiter.on_success(0.1)
+            return limiter.limit
+
+        self.assertEqual(trio.run(main), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
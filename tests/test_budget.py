@@ -0,0 +1,97 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from argparse import Namespace
+
+import httpx
+import trio
+import trio.testing
+
+from gitsint import export_csv, launch_module
+from gitsint.modules.profile.friends import friends
+from gitsint.utils.budget import cancelled, module_deadline, parse_budgets
+
+USER = {"login": "exemple"}
+
+
+async def repository(user, client, out, args):
+    out.append({"name": "repository", "data": "[]", "exists": True})
+    await trio.sleep(3600)
+
+
+async def slow_pages(request):
+    """First followers / following pages answer, the next ones never do"""
+    if request.url.params["page"] != "1":
+        await trio.sleep(3600)
+    names = ["alice", "bob"] if request.url.params["tab"] == "followers" else ["bob"]
+    spans = "".join(
+        f'<span class="Link--primary">{name}</span><span class="Link--secondary">{name}</span>'
+        for name in names
+    )
+    return httpx.Response(200, text=f"<html>{spans}</html>")
+
+
+def run(module, args, deadline=None, user=USER):
+    async def main():
+        out = []
+        end = trio.current_time() + deadline if deadline else float("inf")
+        async with httpx.AsyncClient(transport=httpx.MockTransport(slow_pages)) as client:
+            await launch_module(module, user, client, out, args, end)
+        return out
+
+    return trio.run(main, clock=trio.testing.MockClock(autojump_threshold=0))
+
+
+class TestBudget(unittest.TestCase):
+    def test_parse_budgets(self):
+        self.assertEqual(parse_budgets(["60", "repository=300"]), {"*": 60, "repository": 300})
+        self.assertEqual(parse_budgets(None), {})
+        with self.assertRaises(ValueError):
+            parse_budgets(["repository=soon"])
+        with self.assertRaises(ValueError):
+            parse_budgets(["0"])
+
+    def test_module_deadline(self):
+        budgets = {"*": 60, "repository": 300}
+        self.assertEqual(module_deadline(budgets, "friends", 10), 70)
+        self.assertEqual(module_deadline(budgets, "repository", 10, deadline=100), 100)
+        self.assertEqual(module_deadline({}, "friends", 10, deadline=100), 100)
+
+    def test_cancelled(self):
+        self.assertFalse(cancelled(ValueError()))
+
+    def test_module_budget_keeps_records(self):
+        out = run(repository, Namespace(module_budgets={"repository": 5}))
+        self.assertEqual(len(out), 2)
+        self.assertTrue(out[0]["exists"])
+        self.assertTrue(out[1]["partial"])
+        self.assertEqual(out[1]["domain"], "repository")
+
+    def test_deadline(self):
+        out = run(repository, Namespace(module_budgets={}), deadline=5)
+        self.assertTrue(out[-1]["partial"])
+
+    def test_friends_keeps_scraped_pages(self):
+        user = {"login": "exemple", "followers": 120, "following": 120}
+        out = run(friends, Namespace(module_budgets={"friends": 5}), user=user)
+        self.assertEqual(len(out), 1)
+        self.assertTrue(out[0]["partial"])
+        self.assertEqual([friend["username"] for friend in json.loads(out[0]["data"])], ["bob"])
+
+    def test_partial_records_export_to_csv(self):
+        profile = {"name": "aprofile", "domain": "Github Profile", "exists": True, "data": "{}"}
+        out = [profile] + run(repository, Namespace(module_budgets={"repository": 5}))
+        with tempfile.TemporaryDirectory() as output:
+            export_csv(out, Namespace(output=output, csvoutput=True, jsonoutput=False), "exemple")
+            (name,) = os.listdir(output)
+            with open(os.path.join(output, name), encoding="utf8", newline="") as csv_file:
+                rows = list(csv.DictReader(csv_file))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["partial"], "")
+        self.assertEqual(rows[2]["partial"], "True")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import tempfile
+import threading
+import unittest
+
+import httpx
+import trio
+
+from gitsint.utils.cache import CacheTransport
+from gitsint.utils.tokens import TokenPool, TokenPoolTransport
+
+URL = "https://api.github.com/users/exemple"
+
+
+class TestCacheTransport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.requests = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def handler(self, request):
+        self.requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"', "X-RateLimit-Remaining": "41"})
+        return httpx.Response(
+            200, json={"login": "exemple"}, headers={"ETag": '"v1"', "X-RateLimit-Remaining": "42"}
+        )
+
+    def get(self, count, **kwargs):
+        async def run():
+            transport = CacheTransport(httpx.MockTransport(self.handler), self.tmp.name, **kwargs)
+            responses = []
+            async with httpx.AsyncClient(transport=transport) as client:
+                for _ in range(count):
+                    responses.append(await client.get(URL))
+            return responses
+
+        return trio.run(run)
+
+    def test_revalidates_with_etag(self):
+        first, second = self.get(2)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), {"login": "exemple"})
+        self.assertEqual(second.headers["x-ratelimit-remaining"], "41")
+        self.assertEqual(self.requests[1].headers["if-none-match"], '"v1"')
+
+    def test_ttl_skips_network(self):
+        responses = self.get(3, ttl=60)
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(responses[2].json(), {"login": "exemple"})
+
+    def test_size_eviction(self):
+        async def run():
+            transport = CacheTransport(httpx.MockTransport(self.handler), self.tmp.name, max_size=1)
+            async with httpx.AsyncClient(transport=transport) as client:
+                await client.get(URL)
+                await client.get(URL + "2")
+            return transport.index
+
+        index = trio.run(run)
+        self.assertLessEqual(len(index), 1)
+
+    def test_disk_io_is_off_the_event_loop(self):
+        threads = []
+
+        class RecordingTransport(CacheTransport):
+            def load(self, key):
+                threads.append(threading.current_thread())
+                return super().load(key)
+
+            def save(self, key, meta, body):
+                threads.append(threading.current_thread())
+                super().save(key, meta, body)
+
+            def touch(self, key):
+                threads.append(threading.current_thread())
+                super().touch(key)
+
+        async def run():
+            transport = RecordingTransport(
+                httpx.MockTransport(self.handler), self.tmp.name, ttl=60
+            )
+            async with httpx.AsyncClient(transport=transport) as client:
+                await client.get(URL)
+                await client.get(URL)
+
+        trio.run(run)
+        # load + save, then load + touch
+        self.assertEqual(len(threads), 4)
+        self.assertNotIn(threading.main_thread(), threads)
+
+    def test_token_pool_under_the_cache(self):
+        def handler(request):
+            self.requests.append(request)
+            login = request.headers.get("authorization", "anonymous").split()[-1]
+            return httpx.Response(200, json={"login": login}, headers={"ETag": f'"{login}"'})
+
+        def whoami(tokens):
+            async def run():
+                transport = httpx.MockTransport(handler)
+                if tokens:
+                    transport = TokenPoolTransport(transport, TokenPool(tokens))
+                cache = CacheTransport(
+                    transport, self.tmp.name, ttl=60, auth=transport if tokens else None
+                )
+                async with httpx.AsyncClient(transport=cache) as client:
+                    user = await client.get("https://api.github.com/user")
+                    public = await client.get(URL)
+                return user.json()["login"], public.json()["login"]
+
+            return trio.run(run)
+
+        self.assertEqual(whoami(["alice"]), ("alice", "alice"))
+        # Another token or none: /user is not served from the cache of alice
+        self.assertEqual(whoami(["bob"]), ("bob", "bob"))
+        self.assertEqual(whoami([]), ("anonymous", "anonymous"))
+        self.assertEqual(len(self.requests), 6)
+        # Same tokens: everything comes from the cache
+        self.assertEqual(whoami(["alice"]), ("alice", "alice"))
+        self.assertEqual(len(self.requests), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from gitsint.modules.repos.repository import _clone_options, clone_and_collect_data
+from gitsint.utils.commits import Identity
+
+
+def git(*args):
+    return subprocess.run(
+        ["git", *args], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+class TestCloneModes(unittest.TestCase):
+    def test_clone_options(self):
+        self.assertEqual(_clone_options({}), {})
+        self.assertEqual(
+            _clone_options({"clone_mode": "partial", "depth": 10}),
+            {"filter": "blob:none", "no_checkout": True, "depth": 10, "no_single_branch": True},
+        )
+        self.assertEqual(_clone_options({"clone_mode": "mirror", "depth": 5}), {"mirror": True, "depth": 5})
+        with self.assertRaises(ValueError):
+            _clone_options({"clone_mode": "shallow"})
+
+    def test_every_mode_reads_the_authors(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            upstream = Path(tmp) / "upstream"
+            git("init", "-q", str(upstream))
+            (upstream / "file.txt").write_text("content")
+            git("-C", str(upstream), "add", "file.txt")
+            git("-C", str(upstream), "-c", "user.name=Alice", "-c", "user.email=a@x.io",
+                "commit", "-q", "-m", "first")
+            git("-C", str(upstream), "config", "uploadpack.allowFilter", "true")
+            repo = {"name": "project", "full_name": "owner/project", "clone_url": upstream.as_uri()}
+
+            for mode in ("full", "partial", "bare", "mirror"):
+                with self.subTest(mode=mode):
+                    results = Path(tmp) / mode
+                    _, authors = clone_and_collect_data(
+                        repo, "owner", {"clone_mode": mode}, results, []
+                    )
+                    self.assertEqual(authors, [Identity("Alice", "a@x.io")])
+                    clone = results / "project"
+                    checked_out = (clone / "file.txt").exists()
+                    self.assertEqual(checked_out, mode == "full")
+                    # A second scan refreshes the existing clone
+                    _, authors = clone_and_collect_data(
+                        repo, "owner", {"clone_mode": mode}, results, []
+                    )
+                    self.assertEqual(len(authors), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
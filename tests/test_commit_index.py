@@ -0,0 +1,49 @@
+import os
+import subprocess
+import tempfile
+import unittest
+
+from gitsint.utils.commit_index import CommitIndex, extract_commits_indexed
+from gitsint.utils.commits import extract_commits
+
+
+def commit(path, name, email, message):
+    subprocess.run(
+        ["git", "-C", path, "-c", f"user.name={name}", "-c", f"user.email={email}",
+         "commit", "-q", "--allow-empty", "-m", message],
+        check=True,
+    )
+
+
+class TestCommitIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.upstream = os.path.join(self.tmp.name, "upstream")
+        subprocess.run(["git", "init", "-q", self.upstream], check=True)
+        commit(self.upstream, "Alice", "alice@example.com", "first")
+        commit(self.upstream, "Bob", "bob@example.com", "second")
+        self.fork = os.path.join(self.tmp.name, "fork")
+        subprocess.run(["git", "clone", "-q", self.upstream, self.fork], check=True)
+        commit(self.fork, "Carol", "carol@example.com", "third")
+        self.index = CommitIndex(os.path.join(self.tmp.name, "commits.sqlite"))
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def test_same_output_as_a_full_walk(self):
+        for path in (self.upstream, self.fork, self.fork):
+            self.assertEqual(
+                extract_commits_indexed(path, self.index, "owner/project"), extract_commits(path)
+            )
+
+    def test_shared_history_is_read_once(self):
+        count = "SELECT count(*) FROM commits"
+        extract_commits_indexed(self.upstream, self.index, "owner/project")
+        self.assertEqual(self.index.conn.execute(count).fetchone()[0], 2)
+        extract_commits_indexed(self.fork, self.index, "owner/project")
+        self.assertEqual(self.index.conn.execute(count).fetchone()[0], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+from git import Repo
+
+from gitsint.modules.repos.repository import _extract_commits
+from gitsint.utils import commits
+from gitsint.utils.commits import GitLogError, Identity, MessageBuffer, extract_commits, iter_log
+
+
+def commit(path, name, email, message):
+    subprocess.run(
+        ["git", "-C", path, "commit", "-q", "--allow-empty", "-m", message],
+        env={"GIT_AUTHOR_NAME": name, "GIT_AUTHOR_EMAIL": email,
+             "GIT_COMMITTER_NAME": name, "GIT_COMMITTER_EMAIL": email,
+             "PATH": "/usr/bin:/bin:/usr/local/bin"},
+        check=True,
+    )
+    return subprocess.run(
+        ["git", "-C", path, "rev-parse", "HEAD"], capture_output=True, text=True
+    ).stdout.strip()
+
+
+class TestGitLogEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = self.tmp.name
+        subprocess.run(["git", "init", "-q", self.path], check=True)
+        self.first = commit(self.path, "Alice", "alice@example.com", "first")
+        commit(self.path, "Bob", "bob@example.com", "second\n\nwith a body")
+        commit(self.path, "Alice", "alice@example.com", "third")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_extract_commits(self):
+        authors, messages = extract_commits(self.path)
+        self.assertEqual(
+            authors,
+            [
+                Identity("Alice", "alice@example.com"),
+                Identity("Bob", "bob@example.com"),
+            ],
+        )
+        self.assertEqual(messages, ["third", "second\n\nwith a body", "first"])
+
+    def test_exclude(self):
+        shas = [sha for sha, _, _, _ in iter_log(self.path, exclude=[self.first])]
+        self.assertEqual(len(shas), 2)
+        self.assertNotIn(self.first, shas)
+
+    def test_fallback_after_partial_log(self):
+        def broken_log(repo_path, exclude=(), revisions=None):
+            yield next(iter_log(repo_path, exclude))
+            raise GitLogError("killed")
+
+        messages = MessageBuffer()
+        with mock.patch.object(commits, "iter_log", broken_log):
+            _, values = _extract_commits(Repo(self.path), messages=messages)
+        self.assertEqual(messages.count, 3)
+        self.assertEqual(sorted(values), ["first", "second\n\nwith a body", "third"])
+
+
+class TestMessageBuffer(unittest.TestCase):
+    def test_sample_is_bounded(self):
+        messages = MessageBuffer("sample", limit=10, length=3)
+        messages.extend(f"message {i}" for i in range(1000))
+        self.assertEqual(messages.count, 1000)
+        self.assertEqual(len(messages.values()), 10)
+        self.assertTrue(all(len(message) == 3 for message in messages.values()))
+
+    def test_spill(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "messages.ndjson")
+            messages = MessageBuffer("spill", path=path)
+            messages.extend(["first", "second\nline"])
+            messages.close()
+            self.assertEqual(messages.values(), [])
+            with open(path, encoding="utf8") as spill:
+                self.assertEqual(
+                    [json.loads(line) for line in spill], ["first", "second\nline"]
+                )
+
+    def test_reset_keeps_previous_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "messages.ndjson")
+            messages = MessageBuffer("spill", path=path)
+            messages.add("previous run")
+            messages.close()
+            messages = MessageBuffer("spill", path=path, append=True)
+            messages.add("walked twice")
+            messages.reset()
+            messages.add("walked once")
+            messages.close()
+            self.assertEqual(messages.count, 1)
+            with open(path, encoding="utf8") as spill:
+                self.assertEqual(
+                    [json.loads(line) for line in spill], ["previous run", "walked once"]
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
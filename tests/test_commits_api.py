@@ -0,0 +1,74 @@
+import json
+import unittest
+
+import httpx
+import trio
+
+from gitsint.utils.commits_api import collect_commits_api
+
+REPO = {"name": "project", "full_name": "exemple/project"}
+BASE = "https://api.github.com/repos/exemple/project/commits?per_page=100"
+
+
+def commits_handler(pages, authors_of_page):
+    """`pages` pages of 100 commits, each page written by `authors_of_page(page)`"""
+    requested = []
+
+    def handler(request):
+        page = int(request.url.params["page"])
+        requested.append(page)
+        if request.url.path != "/repos/exemple/project/commits":
+            return httpx.Response(404, json={"message": "Not Found"})
+        headers = {"Link": f'<{BASE}&page={pages}>; rel="last"'}
+        authors = authors_of_page(page)
+        data = []
+        for i in range(100):
+            name = authors[i % len(authors)]
+            author = {"name": name, "email": f"{name}@x.io"}
+            data.append({"commit": {"author": author, "message": f"{page}-{i}\n"}})
+        return httpx.Response(200, json=data, headers=headers)
+
+    return handler, requested
+
+
+def collect(handler, args, repo=REPO):
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await collect_commits_api(repo, client, args)
+
+    return trio.run(main)
+
+
+class TestCommitsAPI(unittest.TestCase):
+    def test_authors_and_messages(self):
+        handler, requested = commits_handler(3, lambda page: [f"dev{page}"])
+        response, authors = collect(handler, {"page_workers": 2})
+        self.assertEqual(sorted(requested), [1, 2, 3])
+        self.assertEqual(
+            [author["email"] for author in json.loads(response["authors"])],
+            ["dev1@x.io", "dev2@x.io", "dev3@x.io"],
+        )
+        self.assertEqual(len(authors), 3)
+        messages = json.loads(response["messages"])
+        self.assertEqual(len(messages), 300)
+        self.assertEqual(messages[0], "1-0")
+
+    def test_max_commits(self):
+        handler, requested = commits_handler(5, lambda page: [f"dev{page}"])
+        response, _ = collect(handler, {"max_commits": 150})
+        self.assertEqual(sorted(requested), [1, 2])
+        self.assertEqual(len(json.loads(response["messages"])), 150)
+
+    def test_stops_when_no_new_identity(self):
+        handler, requested = commits_handler(10, lambda page: ["same"])
+        collect(handler, {"page_workers": 2})
+        # First page, then one window that brings nobody new
+        self.assertEqual(sorted(requested), [1, 2, 3])
+
+    def test_error(self):
+        handler, _ = commits_handler(1, lambda page: ["dev"])
+        self.assertEqual(collect(handler, {}, {"name": "gone", "full_name": "exemple/gone"}), (None, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from argparse import ArgumentTypeError
+
+from gitsint.utils.filters import cli_date, filter_repositories
+
+
+def repo(name, **fields):
+    return {
+        "name": name,
+        "size": 100,
+        "fork": False,
+        "archived": False,
+        "language": "Python",
+        "stargazers_count": 0,
+        "pushed_at": "2024-06-01T00:00:00Z",
+        **fields,
+    }
+
+
+REPOS = [
+    repo("tool", stargazers_count=50),
+    repo("fork", fork=True),
+    repo("old", archived=True, pushed_at="2019-01-01T00:00:00Z"),
+    repo("site.github.io", language="HTML", pushed_at="2024-07-01T00:00:00Z"),
+    repo("huge", size=900000),
+    repo("empty", size=0),
+]
+
+
+def names(args):
+    return [r["name"] for r in filter_repositories(REPOS, args)]
+
+
+class TestRepositoryFilters(unittest.TestCase):
+    def test_defaults_drop_forks_and_empty(self):
+        self.assertEqual(names({"fork": False}), ["tool", "old", "site.github.io", "huge"])
+        self.assertIn("fork", names({"fork": True}))
+
+    def test_metadata_filters(self):
+        self.assertEqual(names({"archived": "exclude", "language": ["python"]}), ["tool", "fork", "huge"])
+        self.assertEqual(
+            names({"pushed_after": "2020-01-01", "exclude": ["*.github.io", "h*"]}), ["tool", "fork"]
+        )
+        self.assertEqual(names({"pushed_before": "2020-01-01"}), ["old"])
+        self.assertEqual(names({"min_stars": 10}), ["tool"])
+        self.assertEqual(names({"include": ["t*", "o*"], "max_stars": 0}), ["old"])
+
+    def test_top_by_recency(self):
+        self.assertEqual(names({"fork": False, "top": 2}), ["site.github.io", "tool"])
+
+    def test_cli_date(self):
+        self.assertEqual(cli_date("2024-01-31"), "2024-01-31")
+        with self.assertRaises(ArgumentTypeError):
+            cli_date("31/01/2024")
+
+
+if __name__ == "__main__":
+    unittest.main()
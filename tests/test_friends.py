@@ -0,0 +1,77 @@
+import unittest
+
+import httpx
+import trio
+
+from gitsint.modules.profile.friends import extract_all_usernames, mutual, track
+
+URL = "https://github.com/exemple?tab=followers"
+
+
+def friend(username):
+    return {"name": username.title(), "username": username, "link": f"https://github.com/{username}"}
+
+
+def pages_handler(pages):
+    """`pages` pages of two users per tab, then empty pages"""
+    requested = []
+
+    async def handler(request):
+        page = int(request.url.params["page"])
+        requested.append((request.url.params["tab"], page))
+        # Later pages answer first: the order must still be kept
+        await trio.sleep(0.01 * max(0, pages - page))
+        names = [f"user{page}a", f"user{page}b"] if page <= pages else []
+        spans = "".join(
+            f'<span class="Link--primary">{name.title()}</span>'
+            f'<span class="Link--secondary">{name}</span>'
+            for name in names
+        )
+        return httpx.Response(200, text=f"<html>{spans}</html>")
+
+    return handler, requested
+
+
+def run(handler, coroutine, *args, **kwargs):
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await coroutine(*args[:1], client, *args[1:], **kwargs)
+
+    return trio.run(main)
+
+
+class TestFriends(unittest.TestCase):
+    def test_known_count_fetches_pages_concurrently(self):
+        handler, requested = pages_handler(3)
+        users = run(handler, extract_all_usernames, URL, [], count=120)
+        self.assertEqual(len(requested), 3)
+        self.assertEqual(
+            [user["username"] for user in users],
+            ["user1a", "user1b", "user2a", "user2b", "user3a", "user3b"],
+        )
+
+    def test_unknown_count_walks_until_an_empty_page(self):
+        handler, requested = pages_handler(2)
+        users = run(handler, extract_all_usernames, URL, [])
+        self.assertEqual(len(users), 4)
+        self.assertEqual([page for _, page in requested], [1, 2, 3])
+
+    def test_no_follower_fetches_nothing(self):
+        handler, requested = pages_handler(2)
+        self.assertEqual(run(handler, extract_all_usernames, URL, [], count=0), [])
+        self.assertEqual(requested, [])
+
+    def test_track_scrapes_both_tabs(self):
+        handler, requested = pages_handler(1)
+        run(handler, track, "exemple", [], followers=50, following=50)
+        self.assertEqual(sorted(requested), [("followers", 1), ("following", 1)])
+
+    def test_mutual(self):
+        followers = [friend("alice"), friend("bob"), friend("carol")]
+        following = [friend("carol"), friend("bob"), friend("dave")]
+        self.assertEqual(mutual(followers, following), [friend("bob"), friend("carol")])
+        self.assertEqual(mutual(followers, []), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+from gitsint.utils import gitleaks
+
+
+class TestGitleaksReport(unittest.TestCase):
+    def test_iter_report_across_chunks(self):
+        findings = [
+            {"RuleID": "generic-api-key", "File": f"config{i}.py", "StartLine": i, "Secret": "x" * 50}
+            for i in range(20)
+        ]
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as report:
+            json.dump(findings, report, indent=1)
+
+        with mock.patch.object(gitleaks, "CHUNK_SIZE", 64):
+            parsed = [gitleaks.summarize_finding(f) for f in gitleaks.iter_report(report.name)]
+
+        self.assertEqual(len(parsed), 20)
+        self.assertEqual(parsed[3]["file"], "config3.py")
+        self.assertEqual(parsed[3]["rule"], "generic-api-key")
+
+    def test_empty_report(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as report:
+            report.write("[]")
+        self.assertEqual(list(gitleaks.iter_report(report.name)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import json
+import unittest
+
+import httpx
+import trio
+
+from gitsint.utils import graphql
+
+REPOSITORY = {
+    "name": "tool",
+    "nameWithOwner": "exemple/tool",
+    "description": "A tool",
+    "url": "https://github.com/exemple/tool",
+    "isFork": False,
+    "isArchived": True,
+    "isPrivate": False,
+    "diskUsage": 42,
+    "stargazerCount": 7,
+    "pushedAt": "2024-01-01T00:00:00Z",
+    "primaryLanguage": {"name": "Python"},
+}
+
+
+def connection(nodes, cursor=None):
+    return {"pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor}, "nodes": nodes}
+
+
+class FakeGraphQL:
+    """Two pages of repositories, one page of followers and following"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, request):
+        variables = json.loads(request.content)["variables"]
+        self.queries.append(variables)
+        owner = {"login": "exemple"}
+        if variables["withRepos"]:
+            if variables["repos"] is None:
+                owner["repositories"] = connection([REPOSITORY], cursor="next")
+            else:
+                owner["repositories"] = connection([dict(REPOSITORY, name="other")])
+        user = {"login": "bob", "name": "Bob", "url": "https://github.com/bob"}
+        if variables["withFollowers"]:
+            owner["followers"] = connection([user])
+        if variables["withFollowing"]:
+            owner["following"] = connection([user])
+        return httpx.Response(200, json={"data": {"owner": owner}})
+
+
+def collect(fake, *calls):
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(fake)) as client:
+            return [
+                await graphql.collect("exemple", client, {"token": ["t"]}, connections)
+                for connections in calls
+            ]
+
+    try:
+        return trio.run(main)
+    finally:
+        graphql.forget("exemple")
+
+
+class TestGraphQL(unittest.TestCase):
+    def test_mapping_and_pagination(self):
+        fake = FakeGraphQL()
+        (data,) = collect(fake, ("repositories", "followers", "following"))
+        self.assertEqual([repo["name"] for repo in data["repositories"]], ["tool", "other"])
+        self.assertEqual(
+            data["repositories"][0],
+            {
+                "name": "tool",
+                "full_name": "exemple/tool",
+                "description": "A tool",
+                "html_url": "https://github.com/exemple/tool",
+                "clone_url": "https://github.com/exemple/tool.git",
+                "fork": False,
+                "archived": True,
+                "private": False,
+                "size": 42,
+                "stargazers_count": 7,
+                "pushed_at": "2024-01-01T00:00:00Z",
+                "language": "Python",
+            },
+        )
+        self.assertEqual(
+            data["followers"], [{"name": "Bob", "username": "bob", "link": "https://github.com/bob"}]
+        )
+        # The second query only advances the repositories
+        self.assertEqual(len(fake.queries), 2)
+        self.assertFalse(fake.queries[1]["withFollowers"])
+
+    def test_only_requested_connections(self):
+        fake = FakeGraphQL()
+        repos, again = collect(fake, ("repositories",), ("repositories",))
+        self.assertEqual(set(repos), {"repositories"})
+        self.assertEqual(repos, again)
+        self.assertEqual(len(fake.queries), 2)
+        self.assertFalse(any(q["withFollowers"] or q["withFollowing"] for q in fake.queries))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+import httpx
+import trio
+
+from gitsint.instruments import Profiler, ProfilingTransport
+
+
+class TestProfiler(unittest.TestCase):
+    def test_report(self):
+        profiler = Profiler()
+
+        def handler(request):
+            return httpx.Response(200, json={"login": "exemple"})
+
+        async def main():
+            transport = ProfilingTransport(httpx.MockTransport(handler), profiler)
+            async with httpx.AsyncClient(transport=transport) as client:
+                with profiler.timed("modules", "profile"):
+                    await client.get("https://api.github.com/users/exemple")
+                    await client.get("https://api.github.com/users/exemple/repos")
+
+        trio.run(main, instruments=[profiler])
+        report = profiler.report()
+        self.assertEqual(report["http"]["requests"], 2)
+        self.assertEqual(report["http"]["status"], {"200": 2})
+        self.assertEqual(report["requests"]["GET api.github.com/users"]["count"], 2)
+        self.assertEqual(report["modules"]["profile"]["count"], 1)
+        self.assertGreater(report["scheduler"]["task_steps"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
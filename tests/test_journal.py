@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from argparse import Namespace
+
+import trio
+
+from gitsint import launch_module
+from gitsint.utils.commits import Identity
+from gitsint.utils.journal import Journal
+
+USER = {"login": "exemple"}
+RECORD = {"name": "aprofile", "domain": "Github Profile", "exists": True, "data": {}}
+
+
+async def profile(user, client, out, args):
+    out.append(RECORD)
+
+
+async def friends(user, client, out, args):
+    raise RuntimeError("down")
+
+
+def run(module, journal):
+    async def main():
+        out = []
+        await launch_module(module, USER, None, out, Namespace(journal_log=journal))
+        return out
+
+    return trio.run(main)
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "journal.ndjson")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_finished_module_is_replayed(self):
+        journal = Journal(self.path)
+        self.assertEqual(run(profile, journal), [RECORD])
+        journal.close()
+
+        journal = Journal(self.path)
+        self.assertEqual(journal.module_records("exemple", "profile"), [RECORD])
+        self.assertEqual(run(friends, journal)[0]["error"], True)
+        # Not marked as finished, retried on resume
+        self.assertIsNone(journal.module_records("exemple", "friends"))
+        self.assertEqual(run(profile, journal), [RECORD])
+        journal.close()
+
+    def test_resume_after_crash(self):
+        journal = Journal(self.path)
+        journal.scan(["exemple", "--journal", self.path], ["exemple"])
+        journal.page_done("exemple", "https://github.com/exemple?tab=followers&page=1", [])
+        journal.repo_done("exemple", "exemple/one", None, [Identity("a", "b")])
+        journal.close()
+        with open(self.path, "a", encoding="utf8") as journal_file:
+            journal_file.write('{"type": "repo", "username": "exemple", "full_na')
+
+        journal = Journal(self.path)
+        self.assertEqual(journal.usernames, ["exemple"])
+        self.assertEqual(journal.page("exemple", "https://github.com/exemple?tab=followers&page=1"), [])
+        self.assertEqual(journal.repo("exemple", "exemple/one")["authors"][0]["name"], "a")
+        journal.user_done("exemple", "exemple")
+        journal.close()
+
+        journal = Journal(self.path)
+        self.assertTrue(journal.is_user_done("exemple"))
+        self.assertIsNone(journal.repo("exemple", "exemple/one"))
+        journal.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from argparse import Namespace
+from importlib.metadata import EntryPoint
+from unittest import mock
+
+import trio
+
+from gitsint import launch_module, modules
+from gitsint.modules import available_modules, load_module, select_modules
+from gitsint.modules.profile.friends import friends
+
+
+class TestModules(unittest.TestCase):
+    def test_select_modules(self):
+        self.assertEqual(select_modules(), ["friends", "profile", "repository"])
+        # Registry order, whatever the order on the command line
+        self.assertEqual(select_modules(["repository", "profile"]), ["profile", "repository"])
+        self.assertEqual(select_modules(skipped=["friends"]), ["profile", "repository"])
+        self.assertEqual(select_modules(["profile", "friends"], ["friends"]), ["profile"])
+        with self.assertRaises(ValueError):
+            select_modules(["profil"])
+        with self.assertRaises(ValueError):
+            select_modules(skipped=["friend"])
+
+    def test_load_module(self):
+        self.assertIs(load_module("friends"), friends)
+
+    def test_entry_points(self):
+        plugin = EntryPoint("extra", "gitsint.modules.profile.friends:mutual", "gitsint.modules")
+        shadow = EntryPoint("profile", "somewhere:else", "gitsint.modules")
+        with mock.patch.object(modules, "entry_points", return_value=[plugin, shadow]):
+            self.assertEqual(available_modules()["profile"], modules.MODULES["profile"])
+            self.assertEqual(select_modules(["extra"]), ["extra"])
+            self.assertEqual(load_module("extra").__name__, "mutual")
+
+    def test_failing_plugin_adds_an_error_record(self):
+        async def myplugin(user, client, out, args):
+            raise RuntimeError("down")
+
+        out = []
+        trio.run(launch_module, myplugin, {"login": "exemple"}, None, out, Namespace())
+        self.assertEqual(len(out), 1)
+        self.assertEqual(out[0]["name"], "myplugin")
+        self.assertEqual(out[0]["domain"], "myplugin")
+        self.assertTrue(out[0]["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
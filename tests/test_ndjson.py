@@ -0,0 +1,53 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from gitsint.utils.ndjson import NDJSONSink, RecordStream
+
+RECORD = {"name": "aprofile", "exists": True, "data": {"login": "exemple"}}
+
+
+class TestNDJSON(unittest.TestCase):
+    def test_sink_appends_one_line_per_record(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.ndjson")
+            for _ in range(2):
+                sink = NDJSONSink(path)
+                sink.write("exemple", [RECORD])
+                sink.close()
+            with open(path, encoding="utf8") as ndjson:
+                lines = [json.loads(line) for line in ndjson]
+        self.assertEqual(
+            lines, [{"username": "exemple", "module_name": "aprofile", "data": RECORD}] * 2
+        )
+
+    def test_stream_writes_before_keeping(self):
+        sink = NDJSONSink("-")
+        sink.stream = io.StringIO()
+        out = []
+        stream = RecordStream("exemple", sink, out)
+        stream.append(RECORD)
+        self.assertEqual(json.loads(sink.stream.getvalue())["data"], RECORD)
+        self.assertEqual(out, [RECORD])
+        self.assertFalse(stream.partial or stream.failed)
+
+        # Streamed only: nothing is kept in memory
+        stream = RecordStream("exemple", sink, None)
+        stream.append(dict(RECORD, partial=True))
+        stream.append({"name": "friends", "error": True})
+        self.assertTrue(stream.partial and stream.failed)
+        self.assertEqual(len(sink.stream.getvalue().splitlines()), 3)
+
+    def test_replay_is_not_streamed_again(self):
+        sink = NDJSONSink("-")
+        sink.stream = io.StringIO()
+        out = []
+        RecordStream("exemple", sink, out).replay(RECORD)
+        self.assertEqual(sink.stream.getvalue(), "")
+        self.assertEqual(out, [RECORD])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from gitsint.modules.repos.repository import clone_and_collect_data
+from gitsint.utils import object_cache
+from gitsint.utils.object_cache import network_path, ref_namespace, update
+
+
+def git(*args):
+    return subprocess.run(
+        ["git", *args], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+class TestObjectCache(unittest.TestCase):
+    def test_forks_share_one_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            upstream = Path(tmp) / "upstream"
+            git("init", "-q", str(upstream))
+            git("-C", str(upstream), "-c", "user.name=A", "-c", "user.email=a@x.io",
+                "commit", "-q", "--allow-empty", "-m", "first")
+            fork = Path(tmp) / "fork"
+            git("clone", "-q", str(upstream), str(fork))
+            git("-C", str(fork), "-c", "user.name=B", "-c", "user.email=b@x.io",
+                "commit", "-q", "--allow-empty", "-m", "second")
+
+            cache = Path(tmp) / "cache"
+            first = update(cache, "Owner/Project", "owner/project", upstream.as_uri())
+            second = update(cache, "owner/project", "someone/project", fork.as_uri())
+
+            self.assertEqual(first, second)
+            self.assertEqual(first, network_path(cache, "owner/project"))
+            refs = git("-C", str(first), "for-each-ref", "--format=%(refname)").splitlines()
+            self.assertEqual(len(refs), 2)
+            self.assertTrue(refs[0].startswith(ref_namespace("owner/project")))
+            self.assertTrue(refs[1].startswith(ref_namespace("someone/project")))
+
+    def test_pruned_refs_keep_their_objects(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            upstream = Path(tmp) / "upstream"
+            git("init", "-q", "-b", "main", str(upstream))
+            git("-C", str(upstream), "-c", "user.name=A", "-c", "user.email=a@x.io",
+                "commit", "-q", "--allow-empty", "-m", "first")
+            git("-C", str(upstream), "checkout", "-q", "-b", "topic")
+            git("-C", str(upstream), "-c", "user.name=A", "-c", "user.email=a@x.io",
+                "commit", "-q", "--allow-empty", "-m", "topic")
+            topic = git("-C", str(upstream), "rev-parse", "topic")
+            git("-C", str(upstream), "checkout", "-q", "main")
+
+            cache = Path(tmp) / "cache"
+            store = update(cache, "owner/project", "owner/project", upstream.as_uri())
+            git("-C", str(upstream), "branch", "-q", "-D", "topic")
+            update(cache, "owner/project", "owner/project", upstream.as_uri())
+
+            self.assertEqual(git("-C", str(store), "config", "gc.auto"), "0")
+            self.assertEqual(git("-C", str(store), "config", "gc.pruneExpire"), "never")
+            self.assertNotIn("topic", git("-C", str(store), "for-each-ref"))
+            git("-C", str(store), "gc", "-q")
+            # A clone borrowing from the store may still need the commit
+            self.assertEqual(git("-C", str(store), "cat-file", "-t", topic), "commit")
+
+    def test_partial_store_is_blobless(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            upstream = Path(tmp) / "upstream"
+            git("init", "-q", str(upstream))
+            (upstream / "file.txt").write_text("content")
+            git("-C", str(upstream), "add", "file.txt")
+            git("-C", str(upstream), "-c", "user.name=A", "-c", "user.email=a@x.io",
+                "commit", "-q", "-m", "first")
+            git("-C", str(upstream), "config", "uploadpack.allowFilter", "true")
+
+            cache = Path(tmp) / "cache"
+            store = update(cache, "owner/project", "owner/project", upstream.as_uri(), partial=True)
+            self.assertEqual(store, network_path(cache, "owner/project", partial=True))
+            self.assertNotEqual(store, network_path(cache, "owner/project"))
+            self.assertEqual(git("-C", str(store), "config", "remote.owner/project.promisor"), "true")
+            missing = git("-C", str(store), "rev-list", "--objects", "--all", "--missing=print")
+            self.assertIn("?", missing)
+
+    def test_existing_clone_skips_the_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            upstream = Path(tmp) / "upstream"
+            git("init", "-q", str(upstream))
+            git("-C", str(upstream), "-c", "user.name=A", "-c", "user.email=a@x.io",
+                "commit", "-q", "--allow-empty", "-m", "first")
+            repo = {"name": "project", "full_name": "owner/project", "clone_url": upstream.as_uri()}
+            args = {"object_cache": str(Path(tmp) / "cache")}
+            results = Path(tmp) / "results"
+            with mock.patch.object(object_cache, "update", wraps=object_cache.update) as update_:
+                clone_and_collect_data(repo, "owner", args, results, [])
+                clone_and_collect_data(repo, "owner", args, results, [])
+            self.assertEqual(update_.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
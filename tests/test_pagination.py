@@ -0,0 +1,93 @@
+import unittest
+
+import httpx
+import trio
+
+from gitsint.modules.repos.repository import fetch_repository, repository
+from gitsint.utils.pagination import last_page, page_count
+
+BASE = "https://api.github.com/users/exemple/repos?per_page=100"
+
+
+def repos_handler(pages, link=True):
+    """Serve `pages` pages of 100 repos, with or without a Link header"""
+    requested = []
+
+    def handler(request):
+        page = int(request.url.params["page"])
+        requested.append(page)
+        headers = {}
+        if link and pages > 1:
+            headers["Link"] = f'<{BASE}&page={pages}>; rel="last"'
+        if page > pages:
+            return httpx.Response(200, json=[], headers=headers)
+        data = [{"name": f"repo{page}-{i}"} for i in range(100)]
+        return httpx.Response(200, json=data, headers=headers)
+
+    return handler, requested
+
+
+class TestPagination(unittest.TestCase):
+    def fetch(self, handler, user):
+        async def run():
+            transport = httpx.MockTransport(handler)
+            async with httpx.AsyncClient(transport=transport) as client:
+                return await fetch_repository(user, client, [], {})
+
+        return trio.run(run)
+
+    def test_last_page_from_link(self):
+        response = httpx.Response(
+            200,
+            headers={"Link": f'<{BASE}&page=2>; rel="next", <{BASE}&page=7>; rel="last"'},
+            request=httpx.Request("GET", BASE),
+        )
+        self.assertEqual(last_page(response), 7)
+        self.assertEqual(page_count(201, 100), 3)
+        self.assertIsNone(page_count(None, 100))
+
+    def test_link_header_pages(self):
+        handler, requested = repos_handler(3)
+        repos = self.fetch(handler, {"login": "exemple"})
+        self.assertEqual(len(repos), 300)
+        self.assertEqual(repos[100]["name"], "repo2-0")
+        # No trailing empty page is requested
+        self.assertEqual(sorted(requested), [1, 2, 3])
+
+    def test_public_repos_pages(self):
+        handler, requested = repos_handler(2, link=False)
+        repos = self.fetch(handler, {"login": "exemple", "public_repos": 200})
+        self.assertEqual(len(repos), 200)
+        self.assertEqual(sorted(requested), [1, 2])
+
+    def test_error_is_returned(self):
+        def handler(request):
+            return httpx.Response(404, json={"message": "Not Found"})
+
+        self.assertEqual(self.fetch(handler, {"login": "exemple"})["message"], "Not Found")
+
+        def bad_gateway(request):
+            return httpx.Response(502, text="<html>Bad gateway</html>")
+
+        self.assertEqual(self.fetch(bad_gateway, {"login": "exemple"})["message"], "HTTP 502")
+
+    def test_unknown_error_is_reported(self):
+        message = "You have exceeded a secondary rate limit."
+
+        def handler(request):
+            return httpx.Response(403, json={"message": message})
+
+        async def run():
+            out = []
+            transport = httpx.MockTransport(handler)
+            async with httpx.AsyncClient(transport=transport) as client:
+                await repository({"login": "exemple"}, client, out, {})
+            return out
+
+        (record,) = trio.run(run)
+        self.assertTrue(record["error"])
+        self.assertEqual(record["others"]["errorMessage"], message)
+
+
+if __name__ == "__main__":
+    unittest.main()
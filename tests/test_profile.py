@@ -1,24 +1,72 @@
+import json
+import tempfile
 import unittest
+
 import httpx
+import trio
 
 
 from gitsint.modules.profile.friends import friends as gitsint_friends
-from gitsint.modules.repos.repository import repository as gitsint_repos 
+from gitsint.modules.repos.repository import repository as gitsint_repos
 from gitsint.modules.profile.profile import profile as gitsint_profile
 
+USER = {"login": "exemple", "id": 1, "followers": 2, "following": 1, "public_repos": 0}
+
+
+def handler(request):
+    """Offline stand-in for the GitHub API and the followers pages"""
+    if request.url.host == "github.com":
+        if request.url.params.get("page") != "1":
+            return httpx.Response(200, text="<html></html>")
+        if request.url.params["tab"] == "followers":
+            names = ["alice", "bob"]
+        else:
+            names = ["bob"]
+        spans = "".join(
+            f'<span class="Link--primary">{name.title()}</span>'
+            f'<span class="Link--secondary">{name}</span>'
+            for name in names
+        )
+        return httpx.Response(200, text=f"<html>{spans}</html>")
+    if request.url.path == "/users/exemple":
+        return httpx.Response(200, json=USER)
+    if request.url.path == "/users/exemple/repos":
+        return httpx.Response(200, json=[])
+    return httpx.Response(404, json={"message": "Not Found"})
 
-class TestGitsintModules(unittest.TestCase):
-    async def test_profile(self):
-        
-        username = "exemple"
-        client = httpx.AsyncClient()
 
+def run_module(module, args):
+    async def main():
         out = []
-        
-        await gitsint_repos({'login':username}, client, out, {"size": '50',"fork":False})
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await module(USER, client, out, args)
+        return out
+
+    return trio.run(main)
+
+
+class TestGitsintModules(unittest.TestCase):
+    def test_profile(self):
+        out = run_module(gitsint_profile, {"token": None})
+        self.assertEqual(len(out), 1)
+        self.assertTrue(out[0]["exists"])
+        self.assertEqual(out[0]["data"]["login"], "exemple")
 
+    def test_friends(self):
+        out = run_module(gitsint_friends, {})
+        self.assertEqual(len(out), 1)
+        self.assertEqual(
+            json.loads(out[0]["data"]),
+            [{"name": "Bob", "username": "bob", "link": "https://github.com/bob"}],
+        )
 
-        result = await client.aclose()
+    def test_repository(self):
+        with tempfile.TemporaryDirectory() as output:
+            out = run_module(gitsint_repos, {"size": "50", "fork": False, "output": output})
+        self.assertEqual(len(out), 1)
+        self.assertFalse(out[0]["exists"])
+        self.assertEqual(out[0]["others"]["Message"], "No repositories found for this user.")
 
-        
 
+if __name__ == "__main__":
+    unittest.main()
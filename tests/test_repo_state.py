@@ -0,0 +1,112 @@
+import contextlib
+import io
+import json
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from gitsint.modules.repos.repository import clone_and_collect_data
+from gitsint.utils import commits, repo_state
+from gitsint.utils.commits import Identity
+
+
+def commit(path, name, message):
+    email = f"{name.lower()}@example.com"
+    subprocess.run(
+        ["git", "-C", str(path), "-c", f"user.name={name}", "-c", f"user.email={email}",
+         "commit", "-q", "--allow-empty", "-m", message],
+        check=True,
+    )
+
+
+class TestIncrementalRefresh(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.upstream = Path(self.tmp.name) / "upstream"
+        subprocess.run(["git", "init", "-q", str(self.upstream)], check=True)
+        commit(self.upstream, "Alice", "first")
+        commit(self.upstream, "Alice", "second")
+        self.repo = {
+            "name": "project",
+            "full_name": "owner/project",
+            "clone_url": self.upstream.as_uri(),
+        }
+        self.results = Path(self.tmp.name) / "results"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def scan(self, args=None):
+        """Scan the repository, return (response, authors, SHAs walked by git log)"""
+        walked = []
+
+        def counting_log(repo_path, exclude=(), revisions=None):
+            for entry in iter_log(repo_path, exclude, revisions):
+                walked.append(entry[0])
+                yield entry
+
+        iter_log = commits.iter_log
+        with mock.patch.object(commits, "iter_log", counting_log):
+            response, authors = clone_and_collect_data(
+                self.repo, "owner", args or {}, self.results, []
+            )
+        return response, authors, walked
+
+    def test_only_new_commits_are_walked(self):
+        _, authors, walked = self.scan()
+        self.assertEqual(len(walked), 2)
+        self.assertEqual(authors, [Identity("Alice", "alice@example.com")])
+
+        state = repo_state.load_state(self.results / "project")
+        # Every ref points to the last commit, the first one walked
+        self.assertEqual(set(state["refs"].values()), {walked[0]})
+        self.assertEqual(state["messages"], ["second", "first"])
+
+        commit(self.upstream, "Bob", "third")
+        response, authors, walked = self.scan()
+        self.assertEqual(len(walked), 1)
+        self.assertEqual(
+            authors,
+            [
+                Identity("Bob", "bob@example.com"),
+                Identity("Alice", "alice@example.com"),
+            ],
+        )
+        self.assertEqual(json.loads(response["messages"]), ["third", "second", "first"])
+
+        # Nothing new: the cached results are used without walking
+        response, authors, walked = self.scan()
+        self.assertEqual(walked, [])
+        self.assertEqual(len(authors), 2)
+        self.assertEqual(json.loads(response["messages"]), ["third", "second", "first"])
+
+    def test_spilled_messages_are_counted_again(self):
+        args = {"message_mode": "spill"}
+        self.scan(args)
+        self.assertEqual(repo_state.load_state(self.results / "project")["message_count"], 2)
+
+        commit(self.upstream, "Bob", "third")
+        self.scan(args)
+        self.assertEqual(repo_state.load_state(self.results / "project")["message_count"], 3)
+
+        # Nothing new: the spill file is kept and its messages are counted
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            _, authors, _ = self.scan(args)
+        self.assertIn("Extracted 2 authors and 3 messages", output.getvalue())
+        spilled = (self.results / "project.messages.ndjson").read_text().splitlines()
+        self.assertEqual(len(spilled), 3)
+
+    def test_existing_commits(self):
+        self.scan()
+        shas = list(repo_state.load_state(self.results / "project")["refs"].values())
+        self.assertEqual(
+            repo_state.existing_commits(self.results / "project", shas + ["0" * 40]),
+            sorted(set(shas)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import functools
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from argparse import Namespace
+
+import httpx
+import trio
+
+import gitsint
+
+USER = {"login": "exemple", "id": 1, "followers": 0, "following": 0, "public_repos": 0}
+
+
+def handler(request):
+    """One unreachable user, one failing user and a working one"""
+    if request.url.path == "/users/unreachable":
+        raise httpx.ConnectError("connection refused", request=request)
+    if request.url.path == "/users/broken":
+        return httpx.Response(502, json={"message": "Server Error"})
+    if request.url.path == "/users/nobody":
+        return httpx.Response(200, json=[])
+    if request.url.path == "/users/exemple":
+        return httpx.Response(200, json=USER)
+    if request.url.path == "/users/exemple/repos":
+        return httpx.Response(200, json=[])
+    return httpx.Response(404, json={"message": "Not Found"})
+
+
+def scan(*argv, stdout=False):
+    """Run the CLI offline, return the NDJSON lines it wrote to a file or to stdout"""
+    with tempfile.TemporaryDirectory() as folder:
+        ndjson = os.path.join(folder, "results.ndjson")
+        captured = io.StringIO()
+        saved = sys.argv, sys.stdout, gitsint.build_client
+        sys.argv = ["gitsint", *argv, "--no-clear", "--output", folder, "--ndjson"]
+        sys.argv += [] if stdout else [ndjson]
+        sys.stdout = captured
+        gitsint.build_client = functools.partial(
+            gitsint.build_client, transport=httpx.MockTransport(handler)
+        )
+        try:
+            trio.run(gitsint.maincore)
+        finally:
+            sys.argv, sys.stdout, gitsint.build_client = saved
+        if stdout:
+            return [json.loads(line) for line in captured.getvalue().splitlines()]
+        with open(ndjson, encoding="utf8") as ndjson_file:
+            return [json.loads(line) for line in ndjson_file]
+
+
+def fetch_user(username):
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await gitsint.fetch_user(username, client, Namespace(token=None))
+
+    return trio.run(main)
+
+
+class TestScan(unittest.TestCase):
+    def test_fetch_user(self):
+        self.assertEqual(fetch_user("exemple"), USER)
+        self.assertEqual(fetch_user("ghost"), "Error: User not found")
+        self.assertEqual(
+            fetch_user("broken"), "Error: unexpected response from GitHub (502 Server Error)"
+        )
+        self.assertTrue(fetch_user("nobody").startswith("Error: "))
+
+    def test_failing_users_do_not_stop_the_batch(self):
+        lines = scan("unreachable", "broken", "nobody", "exemple", "--http-retries", "0")
+        self.assertEqual({line["username"] for line in lines}, {"exemple"})
+        self.assertIn("aprofile", {line["module_name"] for line in lines})
+
+    def test_ndjson_stdout_only_carries_records(self):
+        lines = scan("exemple", stdout=True)
+        self.assertTrue(lines)
+        self.assertEqual({line["username"] for line in lines}, {"exemple"})
+
+
+if __name__ == "__main__":
+    unittest.main()
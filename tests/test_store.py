@@ -0,0 +1,51 @@
+import json
+import os
+import tempfile
+import unittest
+
+from gitsint.utils.store import Store
+
+
+def repository_record(repos):
+    return {
+        "name": "repository",
+        "data": json.dumps(
+            [
+                {"name": name, "description": None, "authors": json.dumps(authors)}
+                for name, authors in repos.items()
+            ]
+        ),
+    }
+
+
+class TestStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = Store(os.path.join(self.tmp.name, "gitsint.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_users_sharing_an_email(self):
+        shared = {"name": "Alice", "email": "alice@example.com"}
+        self.store.save_scan(
+            "alice",
+            [
+                {"name": "aprofile", "data": {"login": "alice", "name": "Alice"}},
+                repository_record({"tool": [shared, {"name": "Bob", "email": "bob@example.com"}]}),
+            ],
+        )
+        self.store.save_scan("carol", [repository_record({"fork": [shared]})])
+        # Scanning again must not duplicate anything
+        self.store.save_scan("carol", [repository_record({"fork": [shared]})])
+
+        rows = self.store.users_by_email("alice@example.com")
+        self.assertEqual(rows, [("alice", "tool", "Alice"), ("carol", "fork", "Alice")])
+        self.assertEqual(self.store.users_by_email("bob@example.com"), [("alice", "tool", "Bob")])
+        name = self.store.conn.execute("SELECT name FROM users WHERE login = 'alice'").fetchone()
+        self.assertEqual(name, ("Alice",))
+
+
+if __name__ == "__main__":
+    unittest.main()
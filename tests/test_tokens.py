@@ -0,0 +1,83 @@
+import time
+import unittest
+
+import httpx
+import trio
+
+from gitsint.utils.tokens import TokenPool, TokenPoolTransport
+
+URL = "https://api.github.com/users/exemple"
+
+
+class TestTokenPool(unittest.TestCase):
+    def run_requests(self, handler, tokens, count, url=URL, headers=None):
+        async def run():
+            transport = TokenPoolTransport(httpx.MockTransport(handler), TokenPool(tokens))
+            async with httpx.AsyncClient(transport=transport) as client:
+                return [await client.get(url, headers=headers) for _ in range(count)]
+
+        return trio.run(run)
+
+    def test_routes_to_most_remaining(self):
+        budgets = {"Bearer a": 10, "Bearer b": 100}
+        used = []
+
+        def handler(request):
+            auth = request.headers["authorization"]
+            used.append(auth)
+            budgets[auth] -= 1
+            return httpx.Response(
+                200,
+                json={},
+                headers={
+                    "X-RateLimit-Remaining": str(budgets[auth]),
+                    "X-RateLimit-Reset": str(int(time.time()) + 3600),
+                },
+            )
+
+        self.run_requests(handler, ["a", "b"], 4)
+        # Once both budgets are known every call goes to the fuller token
+        self.assertEqual(used[2:], ["Bearer b", "Bearer b"])
+
+    def test_retries_exhausted_and_invalid_tokens(self):
+        def handler(request):
+            auth = request.headers["authorization"]
+            if auth == "Bearer bad":
+                return httpx.Response(401, json={"message": "Bad credentials"})
+            if auth == "Bearer empty":
+                return httpx.Response(
+                    403,
+                    json={"message": "API rate limit exceeded"},
+                    headers={
+                        "X-RateLimit-Remaining": "0",
+                        "X-RateLimit-Reset": str(int(time.time()) + 3600),
+                    },
+                )
+            return httpx.Response(200, json={"login": "exemple"})
+
+        (response,) = self.run_requests(handler, ["bad", "empty", "good"], 1)
+        self.assertEqual(response.json(), {"login": "exemple"})
+
+    def test_user_endpoints_are_pinned(self):
+        used = []
+
+        def handler(request):
+            used.append(request.headers["authorization"])
+            return httpx.Response(200, json=[], headers={"X-RateLimit-Remaining": "4000"})
+
+        self.run_requests(handler, ["a", "b"], 4, url="https://api.github.com/user/repos")
+        self.assertEqual(set(used), {"Bearer a"})
+
+    def test_explicit_authorization_is_kept(self):
+        used = []
+
+        def handler(request):
+            used.append(request.headers["authorization"])
+            return httpx.Response(200, json={})
+
+        self.run_requests(handler, ["a", "b"], 2, headers={"Authorization": "Bearer own"})
+        self.assertEqual(used, ["Bearer own", "Bearer own"])
+
+
+if __name__ == "__main__":
+    unittest.main()